@@ -1,8 +1,15 @@
 """Functions for detecting significant evolutionary events on a phylogenetic tree.
 """
 
+import logging
+
+import numpy as np
+from numba import njit
+
 from ..core.models import AnalysisResult
 
+logger = logging.getLogger(__name__)
+
 
 def detect_significant_events(result: AnalysisResult, config: dict | None = None) -> list:
     """
@@ -19,9 +26,10 @@ def detect_significant_events(result: AnalysisResult, config: dict | None = None
         A list of dictionaries, where each dictionary describes a detected event.
 
     Raises:
-        ValueError: If the result object does not contain an annotated tree.
+        ValueError: If the result object does not contain an annotated tree,
+                    or if a node of that tree has no reconstructed 'state'.
     """
-    print("Detecting significant evolutionary events...")
+    logger.debug("Detecting significant evolutionary events...")
 
     if result.annotated_tree is None:
         raise ValueError("Event detection requires an annotated tree in the AnalysisResult.")
@@ -31,80 +39,66 @@ def detect_significant_events(result: AnalysisResult, config: dict | None = None
         config = {}
     threshold = config.get("change_threshold", 5) # e.g., detect jumps of 5 or more chromosomes
 
-    print(f"Using a change threshold of: {threshold}")
-
-    # In a real implementation, you would traverse the annotated tree,
-    # compare the reconstructed state of a parent node to its child node,
-    # and if the change exceeds the threshold, record it as an event.
-
-    # For example:
-    # events = []
-    # for node in result.annotated_tree.traverse("preorder"):
-    #     if not node.is_root():
-    #         parent_state = node.up.get_ancestral_state() # Fictional method
-    #         child_state = node.get_ancestral_state()
-    #         change = abs(child_state - parent_state)
-    #         if change >= threshold:
-    #             events.append({
-    #                 "node": node.name,
-    #                 "branch_length": node.dist,
-    #                 "parent_state": parent_state,
-    #                 "child_state": child_state,
-    #                 "change": change
-    #             })
-    # return events
-
-    # For now, we return a placeholder message.
-    print("Event detection algorithm is not yet implemented.")
+    logger.debug("Using a change threshold of: %s", threshold)
+
+    states, parents, branch_lengths, names, raw_states = _tree_to_arrays(result.annotated_tree)
+
+    hits = _significant_changes(states, parents, float(threshold))
+
     return [
         {
-            "placeholder": True,
-            "message": "Algorithm not implemented. Would have searched for changes > threshold.",
+            "node": names[i],
+            "branch_length": float(branch_lengths[i]),
+            "parent_state": raw_states[parents[i]],
+            "child_state": raw_states[i],
+            "change": float(abs(states[i] - states[parents[i]])),
         }
+        for i in hits
     ]
 
 
-# Example of how to use this analysis module:
-if __name__ == '__main__':
-    from ..core.models import AnalysisResult
-
-    print("--- Example Event Detection ---")
-
-    # 1. Create a dummy AnalysisResult that contains an annotated tree
-    #    In a real scenario, this tree would be an ete3.Tree object with custom attributes.
-    class DummyAnnotatedTree:
-        def __init__(self):
-            self.name = "root"
-        def __str__(self):
-            return "A dummy annotated tree object"
-
-    good_result = AnalysisResult(
-        annotated_tree=DummyAnnotatedTree(),
-        parameters={"some_param": 1},
-        likelihood=-50.0
-    )
-
-    print("\nAnalyzing a result with an annotated tree:")
-    try:
-        events = detect_significant_events(good_result, config={"change_threshold": 3})
-        print(f"--> Detected events: {events}")
-    except ValueError as e:
-        print(f"Caught unexpected error: {e}")
-
+@njit(cache=True)
+def _significant_changes(states, parents, threshold):
+    """
+    Compares every node with its parent and returns the indices of the nodes
+    whose change is at or above the threshold, packed at the front of the
+    output. The root (parent index -1) never counts as an event.
+    """
+    n = states.shape[0]
+    hits = np.empty(n, dtype=np.int64)
+    count = 0
+    for i in range(n):
+        p = parents[i]
+        if p >= 0 and abs(states[i] - states[p]) >= threshold:
+            hits[count] = i
+            count += 1
+    return hits[:count]
+
+
+def _tree_to_arrays(tree):
+    """
+    Flattens an annotated tree into parallel arrays in preorder.
 
-    # 2. Create a dummy result WITHOUT an annotated tree
-    bad_result = AnalysisResult(
-        annotated_tree=None,
-        parameters={"some_param": 1},
-        likelihood=-50.0
+    Returns:
+        A tuple (states, parents, branch_lengths, names, raw_states) where
+        parents[i] is the index of node i's parent (-1 for the root) and
+        raw_states keeps the reconstructed states as they were annotated.
+    """
+    nodes = list(tree.traverse("preorder"))
+    position = {id(node): i for i, node in enumerate(nodes)}
+
+    raw_states = [getattr(node, "state", None) for node in nodes]
+    if any(state is None for state in raw_states):
+        raise ValueError(
+            "Event detection requires every node of the annotated tree to carry a 'state'."
+        )
+
+    states = np.asarray(raw_states, dtype=np.float64)
+    parents = np.fromiter(
+        (position[id(node.up)] if node.up is not None else -1 for node in nodes),
+        dtype=np.int64,
+        count=len(nodes),
     )
-
-    print("\nAnalyzing a result without an annotated tree (expected to fail):")
-    try:
-        events = detect_significant_events(bad_result)
-        print(f"--> Detected events: {events}")
-    except ValueError as e:
-        print(f"Caught expected error: {e}")
-
-    print("\nEvent detection structure implemented.")
-"""
\ No newline at end of file
+    branch_lengths = np.fromiter((node.dist for node in nodes), dtype=np.float64, count=len(nodes))
+    names = [node.name for node in nodes]
+    return states, parents, branch_lengths, names, raw_states
@@ -1,9 +1,35 @@
 """Functions for model selection, such as comparing AIC scores.
 """
 
+import logging
+import multiprocessing
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Callable
+
 import numpy as np
 from ..core.models import AnalysisResult
 
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    import json
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+logger = logging.getLogger(__name__)
+
+# AIC scores of results already seen by compare_models, keyed on id(result)
+# so large results are never hashed. Each entry keeps the log-likelihood and
+# parameter count it was computed from, so a mutated result is recomputed,
+# and is evicted once its result is garbage collected.
+_AIC_CACHE: dict[int, tuple[float, int, float]] = {}
+
 
 def calculate_aic(log_likelihood: float, num_params: int) -> float:
     """Calculates the Akaike Information Criterion (AIC)."""
@@ -23,88 +49,135 @@ def compare_models(results: list[AnalysisResult]) -> dict:
                  output of a different model run.
 
     Returns:
-        A dictionary summarizing the comparison, often ranking models by AIC.
+        A dictionary summarizing the comparison. Its 'comparison' entry lists
+        the models ranked by AIC, each with its AIC difference to the best
+        model ('delta_aic') and its Akaike weight ('aic_weight').
 
     Raises:
         ValueError: If the list of results is empty or if results are missing
                     necessary information (likelihood, number of parameters).
     """
-    print("Comparing models...")
+    logger.debug("Comparing models (%d candidates)", len(results))
 
     if not results:
         raise ValueError("The list of results to compare cannot be empty.")
 
-    comparison_table = []
+    valid_results = []
 
     for result in results:
         if result.likelihood is None:
-            print(f"Skipping a result because it has no likelihood score (e.g., Parsimony).")
+            logger.debug("Skipping a result because it has no likelihood score (e.g., Parsimony).")
             continue
 
         # The number of parameters should be stored in the parameters dict.
         # For this example, we'll assume it's under a 'num_params' key.
         if "num_params" not in result.parameters:
-            print(
-                f"Skipping a result because 'num_params' is not in its parameters dict."
-            )
+            logger.debug("Skipping a result because 'num_params' is not in its parameters dict.")
             continue
 
-        log_L = result.likelihood
-        k = result.parameters["num_params"]
-        aic_score = calculate_aic(log_L, k)
+        valid_results.append(result)
 
-        comparison_table.append(
-            {
-                "model_name": result.parameters.get("model_name", "Unknown"),
-                "log_likelihood": log_L,
-                "num_params": k,
-                "aic": aic_score,
-            }
-        )
-
-    if not comparison_table:
+    if not valid_results:
         raise ValueError("No valid results found to compare.")
 
-    # Sort the table by AIC score (lower is better)
-    comparison_table.sort(key=lambda x: x["aic"])
+    # Compute every AIC score in one vectorized expression rather than one
+    # calculate_aic() call per model; this matters for large model sweeps.
+    n = len(valid_results)
+    log_L = np.fromiter((r.likelihood for r in valid_results), dtype=np.float64, count=n)
+    k = np.fromiter((r.parameters["num_params"] for r in valid_results), dtype=np.int64, count=n)
+    aic = np.empty(n, dtype=np.float64)
+    misses = []
+    for i, result in enumerate(valid_results):
+        cached = _AIC_CACHE.get(id(result))
+        if cached is not None and cached[0] == log_L[i] and cached[1] == k[i]:
+            aic[i] = cached[2]
+        else:
+            misses.append(i)
+
+    if misses:
+        miss = np.asarray(misses)
+        aic[miss] = 2.0 * k[miss] - 2.0 * log_L[miss]
+        for i in misses:
+            _remember_aic(valid_results[i], float(log_L[i]), int(k[i]), float(aic[i]))
+
+    # Akaike weights, computed relative to the best model so the exponent
+    # never overflows.
+    delta_aic = aic - aic.min()
+    weights = np.exp(-0.5 * delta_aic)
+    weights /= weights.sum()
+
+    # Rank by AIC score (lower is better), keeping input order for ties
+    order = np.argsort(aic, kind="stable")
+
+    comparison_table = [
+        {
+            "model_name": valid_results[i].parameters.get("model_name", "Unknown"),
+            "log_likelihood": float(log_L[i]),
+            "num_params": int(k[i]),
+            "aic": float(aic[i]),
+            "delta_aic": float(delta_aic[i]),
+            "aic_weight": float(weights[i]),
+        }
+        for i in order
+    ]
 
     return {"comparison": comparison_table}
 
 
-# Example of how to use this analysis module:
-if __name__ == '__main__':
-    from ..core.models import AnalysisResult
-
-    print("--- Example Model Comparison ---")
-
-    # 1. Create a list of dummy AnalysisResult objects
-    #    Simulating a comparison between a simple (BM) and a complex (OU) model.
-    results_list = [
-        AnalysisResult(
-            annotated_tree=None,
-            parameters={"model_name": "BM", "num_params": 1, "sigma_sq": 0.1},
-            likelihood=-55.4, # Lower likelihood
-        ),
-        AnalysisResult(
-            annotated_tree=None,
-            parameters={"model_name": "OU", "num_params": 3, "alpha": 0.2, "sigma_sq": 0.08},
-            likelihood=-50.1, # Higher likelihood, but more params
-        ),
-        AnalysisResult(
-            annotated_tree=None,
-            parameters={"parsimony_score": 10}, # No likelihood, should be skipped
-            likelihood=None,
-        ),
-    ]
+def _remember_aic(result: AnalysisResult, log_L: float, k: int, aic: float) -> None:
+    """Stores a result's AIC score in the cache until the result is collected."""
+    key = id(result)
+    if key not in _AIC_CACHE:
+        weakref.finalize(result, _AIC_CACHE.pop, key, None)
+    _AIC_CACHE[key] = (log_L, k, aic)
+
+
+def to_json(comparison: dict) -> str:
+    """
+    Serializes a model comparison (as returned by compare_models) to an
+    indented JSON string. Uses orjson when it is installed, which is much
+    faster than the standard library on large comparison tables.
+    """
+    return _dumps(comparison)
+
+
+def _fit_one(fit_fn: Callable[[Any], AnalysisResult], data: Any) -> AnalysisResult:
+    """Runs a single model fit inside a worker process."""
+    return fit_fn(data)
+
+
+def fit_and_compare(
+    fit_fns: list[Callable[[Any], AnalysisResult]],
+    data: Any,
+    max_workers: int | None = None,
+) -> dict:
+    """
+    Fits several models in parallel and compares them with compare_models.
 
-    print(f"Comparing {len(results_list)} model results...")
-    try:
-        comparison = compare_models(results_list)
-        import json
-        print("--> Comparison Result:")
-        print(json.dumps(comparison, indent=2))
-    except ValueError as e:
-        print(f"Caught expected error: {e}")
-
-    print("\nModel selection structure implemented.")
-"""
\ No newline at end of file
+    Each model fit is independent, so the fits are spread over a pool of
+    worker processes. Because the work runs in separate processes, the fit
+    functions must be picklable (module-level functions or functools.partial
+    objects, not lambdas or closures).
+
+    When the fits rely on multithreaded BLAS (NumPy, SciPy, PyMC), limit the
+    BLAS threads per process, e.g. by setting OMP_NUM_THREADS=1, to avoid
+    oversubscribing the CPU cores. Workers are started with the 'spawn'
+    method, so the fit functions must also be importable by the workers.
+
+    Args:
+        fit_fns: A list of callables, each taking `data` and returning an
+                 AnalysisResult.
+        data: The input passed to every fit function, typically a PhyloData.
+        max_workers: The maximum number of worker processes. Defaults to the
+                     number of CPUs.
+
+    Returns:
+        The model comparison dictionary produced by compare_models.
+    """
+    # Forking a process that already runs threads (Numba, OpenMP, BLAS) can
+    # deadlock the workers, so they are started with 'spawn'.
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        results = list(executor.map(_fit_one, fit_fns, repeat(data)))
+    return compare_models(results)
@@ -1,7 +1,40 @@
-"""import pandas as pd
+import functools
+import importlib.util
+import inspect
+import os
+
+import numpy as np
+import pandas as pd
 from ete3 import Tree
 
-from .models import PhyloData
+from .models import PhyloData, _copy_tree
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+# scikit-bio takes a noticeable time to import, so it is only imported
+# once a load actually asks for the skbio backend
+_HAS_SKBIO = importlib.util.find_spec("skbio") is not None
+
+# Newick format codes understood by ete3
+_ETE3_TREE_FORMATS = frozenset(range(10)) | {100}
+
+# Newick parsers load_phylo_data can use; trees always come back as ete3 trees
+_TREE_BACKENDS = ("ete3", "skbio")
+
+# Keyword arguments accepted by pandas.read_csv, resolved once at import
+_READ_CSV_PARAMS = frozenset(inspect.signature(pd.read_csv).parameters) - {"filepath_or_buffer"}
+
+# read_csv options the pyarrow engine rejects; the default parser is kept
+# whenever one of them is requested.
+_PYARROW_UNSUPPORTED = frozenset({
+    "chunksize", "comment", "converters", "dayfirst", "dialect", "float_precision",
+    "iterator", "lineterminator", "low_memory", "memory_map", "nrows", "quoting",
+    "skipfooter", "skipinitialspace", "skiprows", "thousands",
+})
 
 
 def load_phylo_data(
@@ -10,6 +43,9 @@ def load_phylo_data(
     tree_format: int = 0,
     species_col: str = "species",
     counts_col: str = "count",
+    use_cache: bool = True,
+    tree_backend: str = "ete3",
+    **read_csv_kwargs,
 ) -> PhyloData:
     """
     Loads a phylogenetic tree and corresponding trait data into a unified
@@ -22,58 +58,273 @@ def load_phylo_data(
                      Defaults to 0 (Newick).
         species_col: The name of the column in the CSV that contains species names.
         counts_col: The name of the column in the CSV that contains the trait counts.
+        use_cache: Whether to reuse a previous load of the same files. Loads are
+                   cached on the file paths and modification times together
+                   with the other arguments, so edited files are re-read.
+                   Each call gets its own copy of the cached tree and traits.
+        tree_backend: The Newick parser to use. "ete3" (the default) honours
+                      tree_format; "skbio" uses scikit-bio's faster parser
+                      for large trees, keeping node names and branch lengths
+                      only, and converts the result to an ete3 tree.
+        **read_csv_kwargs: Additional keyword arguments passed to pandas.read_csv.
+                           These override the defaults chosen here (the pyarrow
+                           engine when available and an int32 counts column).
 
     Returns:
         A PhyloData object containing the loaded tree and trait data.
 
     Raises:
+        ImportError: If tree_backend is "skbio" and scikit-bio is not installed.
+        TypeError: If read_csv_kwargs holds an option pandas.read_csv does not accept.
         FileNotFoundError: If either the tree or counts file cannot be found.
-        ValueError: If the species names in the tree and counts file do not match,
-                    or if the specified columns are not in the CSV file.
+        ValueError: If tree_format or the column names are invalid, if the
+                    species names in the tree and counts file do not match,
+                    if the specified columns are not in the CSV file, or if
+                    some species have no count.
     """
-    # Load the phylogenetic tree
-    try:
-        tree = Tree(tree_path, format=tree_format)
-    except FileNotFoundError:
+    # Cheap argument and file checks run before any parsing, so a bad call
+    # fails without paying for the tree or table I/O.
+    if isinstance(tree_format, bool) or tree_format not in _ETE3_TREE_FORMATS:
+        raise ValueError(
+            f"Unsupported tree_format {tree_format!r}; expected one of the ete3 "
+            f"format codes {sorted(_ETE3_TREE_FORMATS)}."
+        )
+    if tree_backend not in _TREE_BACKENDS:
+        raise ValueError(
+            f"Unsupported tree_backend {tree_backend!r}; expected one of {list(_TREE_BACKENDS)}."
+        )
+    if tree_backend == "skbio" and not _HAS_SKBIO:
+        raise ImportError("tree_backend='skbio' requires scikit-bio to be installed.")
+    for arg_name, col in (("species_col", species_col), ("counts_col", counts_col)):
+        if not isinstance(col, str) or not col:
+            raise ValueError(f"'{arg_name}' must be a non-empty column name.")
+    if species_col == counts_col:
+        raise ValueError("'species_col' and 'counts_col' must name different columns.")
+    unknown = sorted(k for k in read_csv_kwargs if k not in _READ_CSV_PARAMS)
+    if unknown:
+        raise TypeError(f"Unexpected keyword arguments for pandas.read_csv: {unknown}")
+    # ete3 would treat a missing path as a Newick string, so check it here
+    if not os.path.isfile(tree_path):
         raise FileNotFoundError(f"Tree file not found at: {tree_path}")
-
-    # Load the chromosome count data
-    try:
-        traits_df = pd.read_csv(counts_path)
-    except FileNotFoundError:
+    if not os.path.isfile(counts_path):
         raise FileNotFoundError(f"Counts file not found at: {counts_path}")
 
+    if use_cache:
+        try:
+            frozen_kwargs = tuple(sorted(read_csv_kwargs.items()))
+            hash(frozen_kwargs)
+        except TypeError:
+            # Unhashable read_csv options (e.g. a dtype dict) skip the cache
+            frozen_kwargs = None
+        if frozen_kwargs is not None:
+            cached = _load_cached(
+                os.path.abspath(tree_path),
+                os.stat(tree_path).st_mtime_ns,
+                os.path.abspath(counts_path),
+                os.stat(counts_path).st_mtime_ns,
+                tree_format,
+                tree_backend,
+                species_col,
+                counts_col,
+                frozen_kwargs,
+            )
+            # Hand out copies so callers cannot alter the cached objects
+            return PhyloData(
+                tree=_copy_tree(cached.tree),
+                traits=cached.traits.copy(),
+                counts=cached.counts.copy(),
+                species_order=list(cached.species_order),
+            )
+
+    return _load(tree_path, counts_path, tree_format, tree_backend, species_col, counts_col, read_csv_kwargs)
+
+
+def clear_load_cache() -> None:
+    """Discards every load cached by load_phylo_data."""
+    _load_cached.cache_clear()
+
+
+@functools.lru_cache(maxsize=8)
+def _load_cached(
+    tree_path,
+    tree_mtime_ns,
+    counts_path,
+    counts_mtime_ns,
+    tree_format,
+    tree_backend,
+    species_col,
+    counts_col,
+    frozen_kwargs,
+) -> PhyloData:
+    """Cached wrapper around _load; the modification times only feed the cache key."""
+    return _load(
+        tree_path, counts_path, tree_format, tree_backend, species_col, counts_col, dict(frozen_kwargs)
+    )
+
+
+def _load(
+    tree_path: str,
+    counts_path: str,
+    tree_format: int,
+    tree_backend: str,
+    species_col: str,
+    counts_col: str,
+    read_csv_kwargs: dict,
+) -> PhyloData:
+    """Parses and validates the tree and trait table for load_phylo_data."""
+    # Load the chromosome count data. Only the header is read at first so the
+    # required columns can be checked before the whole table is parsed.
+    header_kwargs = {
+        k: v
+        for k, v in read_csv_kwargs.items()
+        if k not in ("engine", "dtype", "usecols", "nrows", "skipfooter")
+    }
+    columns = pd.read_csv(counts_path, nrows=0, **header_kwargs).columns
+
     # Validate required columns
-    if species_col not in traits_df.columns:
+    if species_col not in columns:
         raise ValueError(
             f"Species column '{species_col}' not found in counts file."
         )
-    if counts_col not in traits_df.columns:
+    if counts_col not in columns:
         raise ValueError(f"Counts column '{counts_col}' not found in counts file.")
 
-    # Set the species column as the index to facilitate matching
-    traits_df = traits_df.set_index(species_col)
+    read_csv_kwargs = dict(read_csv_kwargs)
+    usecols = read_csv_kwargs.get("usecols")
+    if usecols is not None and not callable(usecols):
+        # Positional entries are resolved to names against the header, which
+        # also lets the pyarrow engine accept them.
+        selected = [
+            columns[c] if pd.api.types.is_integer(c) and 0 <= c < len(columns) else c
+            for c in usecols
+        ]
+        if not {species_col, counts_col}.issubset(selected):
+            raise ValueError(
+                f"'usecols' must include both '{species_col}' and '{counts_col}'."
+            )
+        read_csv_kwargs["usecols"] = selected
+
+    # Load the phylogenetic tree
+    if tree_backend == "skbio":
+        import skbio
+
+        tree = _skbio_to_ete3(skbio.TreeNode.read(tree_path, format="newick"))
+    else:
+        tree = Tree(tree_path, format=tree_format)
+    # Every call to get_leaf_names() walks the whole tree, so collect the tip
+    # names once and reuse them for both validation and reordering.
+    leaf_names = tree.get_leaf_names()
+
+    # Only the two needed columns are parsed, with explicit dtypes to skip
+    # pandas' type inference; the multithreaded pyarrow reader is much faster
+    # on large trait tables. pyarrow casts 10.5 to int32 as 10 instead of
+    # failing, so under pyarrow the counts are read as parsed and checked
+    # before the cast.
+    read_kwargs = {"usecols": [species_col, counts_col], "dtype": {counts_col: "int32"}}
+    use_pyarrow = (
+        _HAS_PYARROW
+        and _PYARROW_UNSUPPORTED.isdisjoint(read_csv_kwargs)
+        and not callable(read_csv_kwargs.get("usecols"))
+    )
+    if use_pyarrow:
+        read_kwargs["engine"] = "pyarrow"
+        read_kwargs["dtype"] = {species_col: "string[pyarrow]"}
+    read_kwargs.update(read_csv_kwargs)
+    try:
+        traits_df = pd.read_csv(counts_path, **read_kwargs)
+    except ValueError as e:
+        # Integer parsing fails on blank or fractional counts. Re-read
+        # without the dtype hints (only on this failure path) to report the
+        # affected species.
+        untyped_kwargs = {k: v for k, v in read_kwargs.items() if k != "dtype"}
+        _check_counts(pd.read_csv(counts_path, **untyped_kwargs), species_col, counts_col)
+        raise
+    if use_pyarrow:
+        _check_counts(traits_df, species_col, counts_col)
+        traits_df[counts_col] = traits_df[counts_col].astype(np.int32)
 
     # --- Data Validation ---
-    tree_tips = set(tree.get_leaf_names())
-    trait_species = set(traits_df.index)
+    # Species are checked against the column values directly; the counts are
+    # only laid out in tip order once validation has passed, so a bad file
+    # never pays for an indexed copy of the table.
+    species = pd.Index(traits_df[species_col])
+    if species.has_duplicates:
+        duplicated = species[species.duplicated()].unique()
+        raise ValueError(f"Duplicate species in counts file: {list(duplicated)}")
 
-    if tree_tips != trait_species:
-        missing_in_tree = trait_species - tree_tips
-        missing_in_traits = tree_tips - trait_species
+    # Looking up every tip's row doubles as the species check: tips without
+    # a count get -1, and any rows left over once every tip is matched
+    # belong to species missing from the tree.
+    tip_index = pd.Index(leaf_names)
+    row_of_tip = species.get_indexer(tip_index)
+    unmatched_tips = row_of_tip < 0
+    if unmatched_tips.any() or len(species) != len(tip_index):
+        missing_in_traits = tip_index[unmatched_tips]
+        missing_in_tree = species[~species.isin(tip_index)]
         error_msg = []
-        if missing_in_tree:
+        if not missing_in_tree.empty:
             error_msg.append(
-                f"Species in counts file but not in tree: {missing_in_tree}"
+                f"Species in counts file but not in tree: {list(missing_in_tree)}"
             )
-        if missing_in_traits:
+        if not missing_in_traits.empty:
             error_msg.append(
-                f"Species in tree but not in counts file: {missing_in_traits}"
+                f"Species in tree but not in counts file: {list(missing_in_traits)}"
             )
-        raise ValueError("Mismatch between tree tips and trait data: " + "; ".join(error_msg))
+        if error_msg:
+            raise ValueError("Mismatch between tree tips and trait data: " + "; ".join(error_msg))
+
+    ordered_traits = pd.DataFrame(
+        {counts_col: traits_df[counts_col].to_numpy()[row_of_tip]}, index=tip_index
+    )
 
-    # Ensure the dataframe is sorted in the same order as tree tips (optional but good practice)
-    ordered_traits = traits_df.loc[tree.get_leaf_names()]
+    # Encode species once as ordered categories in tip order, so the traits
+    # index and the tips' species_id share the same integer codes.
+    if not tip_index.has_duplicates:
+        species_dtype = pd.CategoricalDtype(categories=tip_index, ordered=True)
+        ordered_traits.index = pd.CategoricalIndex(
+            pd.Categorical.from_codes(np.arange(len(tip_index)), dtype=species_dtype)
+        )
+        for code, leaf in enumerate(tree.iter_leaves()):
+            leaf.add_feature("species_id", code)
+
+    counts = np.ascontiguousarray(ordered_traits[counts_col].to_numpy(dtype=np.int32))
+    return PhyloData(tree=tree, traits=ordered_traits, counts=counts, species_order=leaf_names)
+
+
+def _check_counts(traits_df: pd.DataFrame, species_col: str, counts_col: str) -> None:
+    """Raises a ValueError naming the species whose count is blank or not a whole number."""
+    counts = traits_df[counts_col]
+    missing_counts = traits_df.loc[counts.isna(), species_col]
+    if not missing_counts.empty:
+        raise ValueError(
+            f"Counts column '{counts_col}' has missing values for species: "
+            f"{list(missing_counts)}"
+        )
+    numeric = pd.to_numeric(counts, errors="coerce")
+    fractional = traits_df.loc[numeric.isna() | (numeric % 1 != 0), species_col]
+    if not fractional.empty:
+        raise ValueError(
+            f"Counts column '{counts_col}' has non-integer values for species: "
+            f"{list(fractional)}"
+        )
+
+
+def _skbio_to_ete3(skbio_root) -> Tree:
+    """
+    Rebuilds a scikit-bio tree as an ete3 tree so downstream code sees one
+    tree API. The copy is iterative to cope with very deep trees.
+    """
+    root = Tree()
+    root.name = skbio_root.name or ""
+    if skbio_root.length is not None:
+        root.dist = skbio_root.length
+    stack = [(skbio_root, root)]
+    while stack:
+        source, target = stack.pop()
+        for child in source.children:
+            node = target.add_child(name=child.name or "")
+            if child.length is not None:
+                node.dist = child.length
+            stack.append((child, node))
+    return root
 
-    return PhyloData(tree=tree, traits=ordered_traits)
-""
@@ -1,14 +1,31 @@
+import importlib
+import logging
+
 from .config import DefaultConfig
-from .data_loader import DataLoader
+from .data_loader import load_phylo_data
+from .models import MethodConfig
 from .pipeline import Pipeline
 # Potential future imports for visualization or specific methods if they are not part of pipeline
 # from ..visualization.interactive import InteractiveVisualizer
 
+logger = logging.getLogger(__name__)
+
+
 class ChromosomeReconstructionFramework:
     """
     Main entry point and orchestrator for the chromosome reconstruction and analysis.
     This class integrates data loading, reconstruction, event detection, and visualization.
     """
+    # Reconstruction methods by name, as (module, class) pairs. Modules are
+    # imported on first use, so e.g. PyMC is only loaded for 'bayesian'.
+    _METHOD_REGISTRY = {
+        "parsimony": ("chr_re.methods.parsimony", "ParsimonyMethod"),
+        "ml": ("chr_re.methods.maximum_likelihood", "MaximumLikelihoodMethod"),
+        "maximum_likelihood": ("chr_re.methods.maximum_likelihood", "MaximumLikelihoodMethod"),
+        "bayesian": ("chr_re.methods.bayesian", "BayesianMethod"),
+        "ensemble": ("chr_re.methods.ensemble", "EnsembleMethod"),
+    }
+
     def __init__(self, config=None):
         """
         Initializes the ChromosomeReconstructionFramework.
@@ -18,64 +35,143 @@ class ChromosomeReconstructionFramework:
                     This config object is passed down to DataLoader and Pipeline.
         """
         self.config = config or DefaultConfig()
-        self.data_loader = DataLoader(self.config)
-        self.pipeline = Pipeline(self.config)
-        
+        # One pipeline per method name, so repeated reconstructions reuse
+        # each pipeline's cached results
+        self.pipeline = None
+        self._pipelines = {}
+        self._last_method = None
+
+        self.data = None
         self.tree = None
         self.counts = None
         self.reconstruction_results = None
         self.events = None
         
-        print(f"ChromosomeReconstructionFramework initialized with config: {type(self.config).__name__}")
+        logger.debug("ChromosomeReconstructionFramework initialized with config: %s", self.config)
 
-    def load_data(self, tree_file: str, counts_file: str, tree_format: str = 'newick', **kwargs):
+    @classmethod
+    def _get_method_instance(cls, method_name: str):
         """
-        Loads and validates tree and chromosome count data using the DataLoader.
+        Creates the reconstruction method registered under a name.
 
         Args:
-            tree_file (str): Path to the phylogenetic tree file.
-            counts_file (str): Path to the chromosome counts data file.
-            tree_format (str): Format of the tree file (e.g., 'newick', 'nexus'). Defaults to 'newick'.
-            **kwargs: Additional keyword arguments for loading chromosome counts (e.g., pandas.read_csv options).
+            method_name (str): The method name, case-insensitive (e.g., 'parsimony', 'ml').
+
+        Returns:
+            A new instance of the matching BaseMethod subclass.
 
         Raises:
-            NotImplementedError: As the full implementation of data_loader methods is pending.
+            ValueError: If no method is registered under that name.
+        """
+        try:
+            module_name, class_name = cls._METHOD_REGISTRY[method_name.lower()]
+        except KeyError:
+            raise ValueError(
+                f"Unknown reconstruction method '{method_name}'. "
+                f"Available methods: {list(cls._METHOD_REGISTRY)}"
+            ) from None
+        return getattr(importlib.import_module(module_name), class_name)()
+
+    def load_data(self, tree_file: str, counts_file: str, tree_format: int = 0, **kwargs):
         """
-        # Placeholder: Will use self.data_loader to load tree and counts
-        # Will also call validate_data
-        print(f"Framework: Loading tree from {tree_file} and counts from {counts_file}")
-        # self.tree = self.data_loader.load_tree(tree_file, format=tree_format)
-        # self.counts = self.data_loader.load_chromosome_counts(counts_file, **kwargs)
-        # self.data_loader.validate_data(self.tree, self.counts)
-        # print("Framework: Data loaded and validated.")
-        raise NotImplementedError("Data loading not fully implemented yet.")
+        Loads and validates tree and chromosome count data using load_phylo_data.
 
-    def reconstruct_ancestors(self, method: str = 'ensemble', **kwargs):
+        Args:
+            tree_file (str): Path to the phylogenetic tree file.
+            counts_file (str): Path to the chromosome counts data file.
+            tree_format (int): The ete3 Newick format code of the tree file. Defaults to 0.
+            **kwargs: Additional keyword arguments for load_phylo_data (e.g., counts_col or
+                      pandas.read_csv options).
+        """
+        logger.debug("Framework: Loading tree from %s and counts from %s", tree_file, counts_file)
+        self.data = load_phylo_data(tree_file, counts_file, tree_format=tree_format, **kwargs)
+        self.tree = self.data.tree
+        self.counts = self.data.traits
+        logger.debug("Framework: Data loaded and validated.")
+
+    def reconstruct_ancestors(
+        self, method: str = 'ensemble', *, method_config: MethodConfig | None = None, **kwargs
+    ):
         """
         Performs ancestral state reconstruction using the configured pipeline and method.
-        # try:
-        #     self.data_loader.load_tree(tree_file, tree_format=tree_format) # Corrected: data_loader.load_tree
-        #     self.data_loader.load_chromosome_counts(counts_file, **kwargs) # Corrected: data_loader.load_chromosome_counts
-        #     self.data_loader.validate_data() # validate_data uses internal tree/counts from data_loader
-        #
-        #     self.tree = self.data_loader.tree
-        #     self.counts = self.data_loader.counts
-        #     print("Framework: Data loading and validation initiated (actual loading depends on DataLoader).")
-        # except Exception as e:
-        #     print(f"Framework: Error during data loading or validation: {e}")
+
         Args:
             method (str, optional): The reconstruction method to use (e.g., 'parsimony', 'ml', 'bayesian', 'ensemble').
                                     Defaults to 'ensemble'.
-            **kwargs: Additional keyword arguments for the reconstruction method.
+            method_config (MethodConfig, optional): A prebuilt method name and configuration,
+                                    used instead of method and kwargs. Reusing one across
+                                    calls avoids rebuilding the configuration each time.
+            **kwargs: Configuration for the reconstruction method (e.g., algorithm='Fitch').
+
+        Returns:
+            The AnalysisResult of the reconstruction.
 
         Raises:
-            NotImplementedError: As the full implementation of pipeline methods is pending.
+            ValueError: If no data has been loaded or the method is unknown.
+            TypeError: If both method_config and configuration keywords are given.
         """
-        # Placeholder: Will use self.pipeline to run reconstruction
-        print(f"Framework: Reconstructing ancestors using {method} method...")
-        # self.reconstruction_results = self.pipeline.run_reconstruction(self.tree, self.counts, method, **kwargs)
-        # print("Framework: Ancestor reconstruction complete.")
-        raise NotImplementedError("Ancestor reconstruction not fully implemented yet.")
+        if method_config is not None and kwargs:
+            raise TypeError("Pass either method_config or configuration keywords, not both.")
+        if self.data is None:
+            raise ValueError("Tree and counts data not loaded. Please call load_data first.")
+        if method_config is not None:
+            method, config = method_config.method, method_config.params
+        else:
+            config = kwargs or None
+        logger.debug("Framework: Reconstructing ancestors using %s method...", method)
+        self.pipeline = self._get_pipeline(method)
+        self.reconstruction_results = self.pipeline.run(self.data, config)
+        logger.debug("Framework: Ancestor reconstruction complete.")
+        return self.reconstruction_results
+
+    def reconstruct_ancestors_batch(self, datasets: list, method: str = 'ensemble', **kwargs):
+        """
+        Reconstructs ancestral states for several datasets, such as bootstrap
+        replicate trees with their traits, sharing one pool of worker processes.
+
+        Args:
+            datasets (list): The PhyloData objects to reconstruct.
+            method (str, optional): The reconstruction method to use. Defaults to 'ensemble'.
+            **kwargs: Configuration for the reconstruction method (e.g., algorithm='Fitch').
+
+        Returns:
+            A list with one AnalysisResult per dataset, in input order.
+
+        Raises:
+            ValueError: If the method is unknown.
+        """
+        logger.debug("Framework: Reconstructing ancestors of %d datasets using %s method...", len(datasets), method)
+        self.pipeline = self._get_pipeline(method)
+        return self.pipeline.run_many(datasets, kwargs or None)
+
+    def _get_pipeline(self, method: str) -> Pipeline:
+        """Returns the pipeline for a method, creating it on first use."""
+        # Repeated calls with the same method skip the lookup entirely
+        if method == self._last_method:
+            return self.pipeline
+        name = method.lower()
+        if name not in self._pipelines:
+            self._pipelines[name] = Pipeline(self._get_method_instance(name))
+        self._last_method = method
+        return self._pipelines[name]
+
+    def close(self) -> None:
+        """
+        Shuts down the worker pools of every cached pipeline and method
+        (e.g. a parallel ensemble's). The framework stays usable; pools are
+        recreated on demand.
+        """
+        for pipeline in self._pipelines.values():
+            pipeline.close()
+            close_method = getattr(pipeline.method, "close", None)
+            if callable(close_method):
+                close_method()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
             
     def detect_events(self, **kwargs):
         """
@@ -111,7 +207,7 @@ class ChromosomeReconstructionFramework:
             NotImplementedError: As the full implementation of event detection is pending.
         """
         # Placeholder: Will use self.pipeline or a dedicated event detection module
-        print("Framework: Detecting events...")
+        logger.debug("Framework: Detecting events...")
         # self.events = self.pipeline.run_event_detection(self.reconstruction_results, **kwargs)
         # print("Framework: Event detection complete.")
         raise NotImplementedError("Event detection not fully implemented yet.")
@@ -135,7 +231,7 @@ class ChromosomeReconstructionFramework:
             NotImplementedError: As the full implementation of visualization is pending.
         """
         # Placeholder: Will use a visualization module
-        print("Framework: Visualizing results...")
+        logger.debug("Framework: Visualizing results...")
         # visualizer = InteractiveVisualizer(self.config) # Or some other visualizer
         # visualizer.plot_tree_with_states(self.tree, self.reconstruction_results, **kwargs)
         # if self.events:
@@ -162,59 +258,59 @@ class ChromosomeReconstructionFramework:
 
 if __name__ == '__main__':
     print("--- Initializing ChromosomeReconstructionFramework with default config ---")
-    framework = ChromosomeReconstructionFramework()
-    
-    # Example of how methods would be called (will raise NotImplementedError)
-    dummy_tree_file = "dummy_tree.nwk"
-    dummy_counts_file = "dummy_counts.csv"
-    
-    # Create dummy files to allow calls to proceed to the print statements before erroring
-    with open(dummy_tree_file, "w") as f:
-        f.write("((A:1,B:1):1,C:2);")
-    with open(dummy_counts_file, "w") as f:
-        f.write("taxon_name,chromosome_number\nA,10\nB,12\nC,14")
-
-    print("\n--- Testing load_data ---")
-    try:
-        framework.load_data(dummy_tree_file, dummy_counts_file)
-    except NotImplementedError as e:
-        print(f"Caught expected error: {e}")
-
-    print("\n--- Testing reconstruct_ancestors ---")
-    try:
-        # Simulate data being loaded for this call
-        framework.tree = "dummy_tree_object" 
-        framework.counts = "dummy_counts_object"
-        framework.reconstruct_ancestors(method='parsimony')
-    except NotImplementedError as e:
-        print(f"Caught expected error: {e}")
-    finally:
-        framework.tree = None # Reset
-        framework.counts = None # Reset
-
-    print("\n--- Testing detect_events ---")
-    try:
-        # Simulate reconstruction results being available
-        framework.reconstruction_results = "dummy_reconstruction_results"
-        framework.detect_events()
-    except NotImplementedError as e:
-        print(f"Caught expected error: {e}")
-    finally:
-        framework.reconstruction_results = None # Reset
-
-    print("\n--- Testing visualize ---")
-    try:
-        # Simulate tree being available
-        framework.tree = "dummy_tree_object"
-        framework.visualize()
-    except NotImplementedError as e:
-        print(f"Caught expected error: {e}")
-    finally:
-        framework.tree = None # Reset
-
-    # Clean up dummy files
-    import os
-    os.remove(dummy_tree_file)
-    os.remove(dummy_counts_file)
-    
-    print("\nChromosomeReconstructionFramework structure implemented.")
+    with ChromosomeReconstructionFramework() as framework:
+
+        # Example of how methods would be called (will raise NotImplementedError)
+        dummy_tree_file = "dummy_tree.nwk"
+        dummy_counts_file = "dummy_counts.csv"
+
+        # Create dummy files to allow calls to proceed to the print statements before erroring
+        with open(dummy_tree_file, "w") as f:
+            f.write("((A:1,B:1):1,C:2);")
+        with open(dummy_counts_file, "w") as f:
+            f.write("taxon_name,chromosome_number\nA,10\nB,12\nC,14")
+
+        print("\n--- Testing load_data ---")
+        try:
+            framework.load_data(dummy_tree_file, dummy_counts_file)
+        except ValueError as e:
+            print(f"Caught expected error: {e}")
+
+        print("\n--- Testing reconstruct_ancestors ---")
+        try:
+            # Simulate data being loaded for this call
+            framework.tree = "dummy_tree_object" 
+            framework.counts = "dummy_counts_object"
+            framework.reconstruct_ancestors(method='parsimony')
+        except ValueError as e:
+            print(f"Caught expected error: {e}")
+        finally:
+            framework.tree = None # Reset
+            framework.counts = None # Reset
+
+        print("\n--- Testing detect_events ---")
+        try:
+            # Simulate reconstruction results being available
+            framework.reconstruction_results = "dummy_reconstruction_results"
+            framework.detect_events()
+        except NotImplementedError as e:
+            print(f"Caught expected error: {e}")
+        finally:
+            framework.reconstruction_results = None # Reset
+
+        print("\n--- Testing visualize ---")
+        try:
+            # Simulate tree being available
+            framework.tree = "dummy_tree_object"
+            framework.visualize()
+        except NotImplementedError as e:
+            print(f"Caught expected error: {e}")
+        finally:
+            framework.tree = None # Reset
+
+        # Clean up dummy files
+        import os
+        os.remove(dummy_tree_file)
+        os.remove(dummy_counts_file)
+
+        print("\nChromosomeReconstructionFramework structure implemented.")
@@ -1,14 +1,17 @@
-from dataclasses import dataclass
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Mapping
 
+import numpy as np
 import pandas as pd
+from ete3 import Tree
 
 # The type for 'tree' can be refined if a single library is enforced,
 # e.g., ete3.Tree or Bio.Phylo.BaseTree.Tree. For now, Any is flexible.
 TreeObject = Any
 
 
-@dataclass
+@dataclass(slots=True)
 class PhyloData:
     """
     A unified data container for phylogenetic analysis inputs.
@@ -17,12 +20,202 @@ class PhyloData:
         tree: The phylogenetic tree object from libraries like ete3 or Biopython.
         traits: A DataFrame where the index matches the tree's tip names and
                 columns represent different traits.
+        counts: The counts column as a contiguous int32 array, in tip order,
+                for numerical code that would otherwise pull it out of
+                the DataFrame on every access.
+        species_order: The tip names matching the positions in counts.
+        unique_traits: The distinct site patterns (trait columns) of a numeric
+                       traits table, one pattern per column.
+        pattern_weights: How many trait columns share each unique pattern.
+        pattern_inverse: For each trait column, the index of its pattern in
+                         unique_traits.
+        traits_values: The traits table as a plain (species, traits) array,
+                       for inner loops that would otherwise pay pandas'
+                       label lookups on every access.
+        species_to_row: Maps each species name to its row in traits_values.
+        leaf_names: The tree's tip names, in traversal order.
+        postorder_names: The names of all nodes, in postorder.
+        postorder_parent: Each postorder node's parent index (-1 for the root).
+        postorder_child_ptr: With postorder_children, the children of node i in
+                             CSR form, as
+                             postorder_children[postorder_child_ptr[i]:postorder_child_ptr[i + 1]].
+        postorder_children: See postorder_child_ptr.
+        postorder_dist: Each postorder node's branch length (float64).
+        leaf_positions: The postorder indices of the tips.
+        leaf_rows: Each tip's row in traits_values (-1 if it has none), in the
+                   order of leaf_positions; see tip_values.
+
+    The traversal fields are computed once, when the object is created, and
+    shared by every method (and ensemble member) that runs on it; replace the
+    PhyloData rather than editing its tree in place.
     """
     tree: TreeObject
     traits: pd.DataFrame
+    counts: np.ndarray | None = None
+    species_order: list[str] | None = None
+    unique_traits: np.ndarray | None = field(default=None, init=False, repr=False)
+    pattern_weights: np.ndarray | None = field(default=None, init=False, repr=False)
+    pattern_inverse: np.ndarray | None = field(default=None, init=False, repr=False)
+    traits_values: np.ndarray | None = field(default=None, init=False, repr=False)
+    species_to_row: dict[str, int] | None = field(default=None, init=False, repr=False)
+    leaf_names: tuple[str, ...] | None = field(default=None, init=False, repr=False)
+    postorder_names: list[str] | None = field(default=None, init=False, repr=False)
+    postorder_parent: np.ndarray | None = field(default=None, init=False, repr=False)
+    postorder_child_ptr: np.ndarray | None = field(default=None, init=False, repr=False)
+    postorder_children: np.ndarray | None = field(default=None, init=False, repr=False)
+    postorder_dist: np.ndarray | None = field(default=None, init=False, repr=False)
+    leaf_positions: np.ndarray | None = field(default=None, init=False, repr=False)
+    leaf_rows: np.ndarray | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if isinstance(self.traits, pd.DataFrame):
+            self.traits_values = self.traits.to_numpy()
+            self.species_to_row = {name: row for row, name in enumerate(self.traits.index)}
+
+        if hasattr(self.tree, "traverse"):
+            self._index_tree()
+
+        # Compress identical site patterns once, so methods can score each
+        # distinct pattern a single time and weight it by its count.
+        if isinstance(self.traits, pd.DataFrame) and all(
+            pd.api.types.is_numeric_dtype(dtype) for dtype in self.traits.dtypes
+        ):
+            self.unique_traits, self.pattern_inverse, self.pattern_weights = np.unique(
+                self.traits.to_numpy(), axis=1, return_inverse=True, return_counts=True
+            )
+            self.pattern_inverse = self.pattern_inverse.reshape(-1)
+
+    def _index_tree(self):
+        """
+        Flattens the tree into postorder arrays with one explicit-stack walk.
+
+        Popping a stack onto which each node's children are pushed in order
+        yields a preorder that visits children right to left; reversed, that
+        is ete3's postorder. The children lists then follow from the parent
+        array by a stable sort, without looking nodes up by identity.
+        """
+        nodes = []
+        pre_parents = []
+        stack = [(self.tree, -1)]
+        while stack:
+            node, parent = stack.pop()
+            pre_parents.append(parent)
+            nodes.append(node)
+            stack.extend((child, len(nodes) - 1) for child in node.children)
+        nodes.reverse()
+
+        n_nodes = len(nodes)
+        pre_parents = np.asarray(pre_parents[::-1], dtype=np.int32)
+        parents = np.where(pre_parents >= 0, n_nodes - 1 - pre_parents, -1).astype(np.int32)
+        child_counts = np.bincount(parents[parents >= 0], minlength=n_nodes)
+
+        self.postorder_names = [node.name for node in nodes]
+        self.leaf_names = tuple(node.name for node in nodes if not node.children)
+        self.postorder_parent = parents
+        self.postorder_dist = np.asarray([node.dist for node in nodes], dtype=np.float64)
+        self.leaf_positions = np.flatnonzero(child_counts == 0)
+        if self.species_to_row is not None:
+            self.leaf_rows = np.asarray(
+                [self.species_to_row.get(name, -1) for name in self.leaf_names], dtype=np.int64
+            )
+        self.postorder_child_ptr = np.concatenate(([0], np.cumsum(child_counts))).astype(np.int32)
+        # The root is the only node without a parent, so it sorts first
+        self.postorder_children = np.argsort(parents, kind="stable")[1:].astype(np.int32)
+
+    def tip_values(self, column: int = 0) -> np.ndarray:
+        """
+        Returns one trait column for the tips, in the order of
+        leaf_positions, without looking species up by name.
+
+        Raises:
+            ValueError: If some tips have no row in the traits table.
+        """
+        missing = self.leaf_rows < 0
+        if missing.any():
+            names = [name for name, absent in zip(self.leaf_names, missing) if absent]
+            raise ValueError(f"No traits for tips: {names}")
+        return self.traits_values[self.leaf_rows, column]
+
+    def to_shared(self) -> tuple["SharedPhyloData", SharedMemory]:
+        """
+        Copies the traits table once into shared memory, so worker processes
+        can map it instead of each receiving a pickled copy.
+
+        Returns:
+            A tuple (shared, shm): the picklable handle to send to workers and
+            the SharedMemory block, which the caller must close() and
+            unlink() once the workers are done.
+
+        Raises:
+            ValueError: If the traits table is not a single-dtype numeric table.
+        """
+        if self.traits_values is None or not pd.api.types.is_numeric_dtype(self.traits_values.dtype):
+            raise ValueError("Only numeric traits tables can be placed in shared memory.")
+        values = self.traits_values
+        shm = SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[...] = values
+        newick = self.tree.write(format=1, format_root_node=True) if self.tree is not None else None
+        shared = SharedPhyloData(
+            shm_name=shm.name,
+            shape=values.shape,
+            dtype=values.dtype.str,
+            newick=newick,
+            index=self.traits.index,
+            columns=self.traits.columns,
+            counts=self.counts,
+            species_order=self.species_order,
+        )
+        return shared, shm
+
+
+@dataclass(frozen=True, slots=True)
+class SharedPhyloData:
+    """
+    A picklable handle to a PhyloData whose traits table lives in shared
+    memory; see PhyloData.to_shared.
+
+    Attributes:
+        shm_name: The name of the SharedMemory block holding the traits values.
+        shape: The shape of the traits values.
+        dtype: The dtype of the traits values, as a NumPy type string.
+        newick: The tree as a format-1 Newick string (names and branch
+                lengths only). A tree object pickles recursively, which
+                fails on deep trees.
+        index: The species labels of the traits table.
+        columns: The column labels of the traits table.
+        counts: The tip-ordered counts array of the original PhyloData.
+        species_order: The tip names of the original PhyloData.
+    """
+    shm_name: str
+    shape: tuple
+    dtype: str
+    newick: str | None
+    index: pd.Index
+    columns: pd.Index
+    counts: np.ndarray | None
+    species_order: list[str] | None
+
+    def attach(self) -> tuple[PhyloData, SharedMemory]:
+        """
+        Rebuilds the PhyloData in the current process on top of the shared
+        block, without copying the traits values.
+
+        Returns:
+            A tuple (data, shm); close shm once data is no longer used.
+        """
+        shm = SharedMemory(name=self.shm_name)
+        values = np.ndarray(self.shape, dtype=np.dtype(self.dtype), buffer=shm.buf)
+        traits = pd.DataFrame(values, index=self.index, columns=self.columns, copy=False)
+        tree = Tree(self.newick, format=1) if self.newick is not None else None
+        data = PhyloData(
+            tree=tree, traits=traits, counts=self.counts, species_order=self.species_order
+        )
+        return data, shm
 
 
-@dataclass
+# weakref_slot keeps results weak-referenceable (model_selection's AIC cache
+# evicts entries through weakref.finalize)
+@dataclass(slots=True, weakref_slot=True)
 class AnalysisResult:
     """
     A unified data container for the results of a phylogenetic analysis.
@@ -35,8 +228,92 @@ class AnalysisResult:
         likelihood: The log-likelihood of the model, if applicable.
         raw_output: The raw, unprocessed output from the analysis method,
                     useful for debugging or custom post-processing.
+        trace_path: Path to a NetCDF file holding a (large) MCMC trace, which
+                    is kept on disk rather than in memory; see load_trace.
+        node_states: Reconstructed states for every node of the input tree, in
+                     its postorder, so a method can report states without
+                     copying and annotating the tree; see realize_tree.
     """
     annotated_tree: TreeObject
     parameters: Dict[str, Any]
     likelihood: float | None = None
     raw_output: Any | None = None
+    trace_path: str | None = None
+    node_states: np.ndarray | None = None
+
+    def realize_tree(self, base_tree, **features):
+        """
+        Builds an annotated copy of the tree the states were computed on.
+
+        Args:
+            base_tree: The input tree of the analysis.
+            **features: Further per-node values to set in the same pass, each
+                        a sequence in the tree's postorder (e.g.
+                        states=state_sets).
+
+        Returns:
+            A copy of base_tree with each node's state as its 'state' feature.
+
+        Raises:
+            ValueError: If the result has no node_states.
+        """
+        if self.node_states is None:
+            raise ValueError("This result has no node_states to annotate a tree with.")
+        tree = _copy_tree(base_tree)
+        columns = {"state": np.asarray(self.node_states).tolist(), **features}
+        for i, node in enumerate(tree.traverse("postorder")):
+            for name, values in columns.items():
+                node.add_feature(name, values[i])
+        return tree
+
+    def load_trace(self):
+        """
+        Reads the MCMC trace saved at trace_path.
+
+        Returns:
+            The trace as an arviz InferenceData object.
+
+        Raises:
+            ValueError: If the result has no saved trace.
+        """
+        if self.trace_path is None:
+            raise ValueError("This result has no saved MCMC trace.")
+        import arviz as az
+
+        return az.from_netcdf(self.trace_path)
+
+
+def _copy_tree(tree):
+    """
+    Copies an ete3 tree node by node, keeping every feature (by reference).
+
+    Unlike tree.copy("newick-extended") nothing is written out and parsed
+    back, so feature values keep their types, and unlike tree.copy("cpickle")
+    the walk is not recursive, so deep (e.g. caterpillar) trees copy fine.
+    """
+    copies = {}
+    for node in tree.traverse("preorder"):
+        clone = node.__class__()
+        for feature in node.features:
+            setattr(clone, feature, getattr(node, feature))
+        clone.features = set(node.features)
+        if node is not tree:
+            copies[id(node.up)].add_child(clone)
+        copies[id(node)] = clone
+    return copies[id(tree)]
+
+
+@dataclass(frozen=True, slots=True)
+class MethodConfig:
+    """
+    A reusable reconstruction request: the method name and its configuration.
+
+    Building one up front lets repeated reconstructions (e.g., in a bootstrap
+    loop) pass the same configuration without re-packing keyword arguments.
+
+    Attributes:
+        method: The registered method name (e.g., 'parsimony').
+        params: The configuration passed to the method's run.
+    """
+    method: str
+    params: Mapping[str, Any] = field(default_factory=dict)
@@ -1,6 +1,21 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import pandas as pd
+
 from ..core.models import PhyloData, AnalysisResult
 from ..methods.base import BaseMethod
 
+logger = logging.getLogger(__name__)
+
+# Maximum number of results a Pipeline keeps for repeated runs
+_CACHE_SIZE = 256
+
 
 class Pipeline:
     """
@@ -16,13 +31,19 @@ class Pipeline:
         into the pipeline upon creation.
 
         Args:
-            method: An instance of a class that inherits from BaseMethod,
-                    e.g., MaximumLikelihoodMethod().
+            method: An object implementing the BaseMethod interface, i.e. a
+                    run(data, config) method, e.g., MaximumLikelihoodMethod().
+                    Subclassing BaseMethod is not required.
         """
-        if not isinstance(method, BaseMethod):
-            raise TypeError("The 'method' must be an instance of a BaseMethod subclass.")
+        if not callable(getattr(method, "run", None)):
+            raise TypeError("The 'method' must provide a callable run(data, config) method.")
         self.method = method
-        print(f"Pipeline initialized with method: {type(self.method).__name__}")
+        self._method_name = type(method).__name__
+        self._cache: OrderedDict[tuple, AnalysisResult] = OrderedDict()
+        # Worker pool for run_many, created on first use and kept until close()
+        self._pool = None
+        self._pool_workers = 0
+        logger.debug("Pipeline initialized with method: %s", self._method_name)
 
     def run(self, data: PhyloData, config: dict | None = None) -> AnalysisResult:
         """
@@ -34,10 +55,107 @@ class Pipeline:
                     analysis method.
 
         Returns:
-            An AnalysisResult object from the executed method.
+            An AnalysisResult object from the executed method. Runs on the same
+            tree, traits and config return the result of the first run (the
+            same object) instead of repeating the analysis, unless the method
+            is marked nondeterministic.
         """
-        print(f"Executing method: {type(self.method).__name__}...")
-        return self.method.run(data, config)
+        key = self._cache_key(data, config)
+        if key is not None and key in self._cache:
+            logger.debug("Reusing cached result for method: %s", self._method_name)
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        logger.debug("Executing method: %s...", self._method_name)
+        result = self.method.run(data, config)
+        self._remember(key, result)
+        return result
+
+    def run_many(
+        self, datasets: list[PhyloData], config: dict | None = None, max_workers: int | None = None
+    ) -> list[AnalysisResult]:
+        """
+        Runs the analysis on several datasets (e.g., bootstrap replicates) in
+        worker processes.
+
+        The worker pool is created on the first call and reused by later
+        calls, so process start-up is paid once per pipeline; call close()
+        to shut it down. Datasets with a cached result are not rerun.
+
+        Args:
+            datasets: The PhyloData objects to analyse.
+            config: The configuration passed to the method for every dataset.
+            max_workers: The number of worker processes for a new pool.
+                         Defaults to the CPU count.
+
+        Returns:
+            One AnalysisResult per dataset, in input order.
+        """
+        keys = [self._cache_key(data, config) for data in datasets]
+        results = [self._cache.get(key) if key is not None else None for key in keys]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        pool = self._get_pool(max_workers)
+        chunksize = max(1, len(pending) // (4 * self._pool_workers))
+        logger.debug("Executing method: %s on %d datasets...", self._method_name, len(pending))
+        outputs = pool.map(
+            self.method.run, [datasets[i] for i in pending], repeat(config), chunksize=chunksize
+        )
+        for i, result in zip(pending, outputs):
+            results[i] = result
+            self._remember(keys[i], result)
+        return results
+
+    def close(self) -> None:
+        """Shuts down the worker pool used by run_many, if any."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def clear_cache(self) -> None:
+        """Discards every result cached by run."""
+        self._cache.clear()
+
+    def _get_pool(self, max_workers: int | None) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool_workers = max_workers or os.cpu_count() or 1
+            # Spawned rather than forked workers, as elsewhere in the package
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._pool_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _cache_key(self, data: PhyloData, config: dict | None) -> tuple | None:
+        if getattr(self.method, "nondeterministic", False):
+            return None
+        try:
+            config_key = tuple(sorted((config or {}).items()))
+            hash(config_key)
+        except TypeError:
+            # Unhashable config values (e.g. an ensemble's methods list) are
+            # not cached, so the data is not fingerprinted either
+            return None
+        return _fingerprint(data), self._method_name, config_key
+
+    def _remember(self, key: tuple | None, result: AnalysisResult) -> None:
+        if key is not None:
+            self._cache[key] = result
+            if len(self._cache) > _CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+
+def _fingerprint(data: PhyloData) -> tuple:
+    """
+    Summarises the inputs of a run: the tree with its branch lengths and
+    node names, and a digest of the traits table including its index.
+    """
+    traits_digest = hashlib.blake2b(
+        pd.util.hash_pandas_object(data.traits, index=True).to_numpy().tobytes(),
+        digest_size=16,
+    ).digest()
+    return data.tree.write(format=1), traits_digest
 
 
 # Example of how to use the new, flexible pipeline
@@ -10,13 +10,35 @@ class BaseMethod(ABC):
     This class defines the common interface that all analysis methods (like
     Maximum Likelihood, Bayesian, Parsimony) must implement. This ensures
     that the core pipeline can treat them interchangeably.
+
+    The pipeline only relies on the run method, so third-party classes that
+    provide it need not inherit from BaseMethod; they can be declared with
+    BaseMethod.register(cls) for type checkers and isinstance checks.
+
+    A method that does annotate data.tree in place must set mutates_tree to
+    True, so that callers sharing one PhyloData between several methods
+    (such as EnsembleMethod) hand it a copy of the tree instead. A method
+    whose results vary between runs on the same input (e.g. MCMC sampling)
+    sets nondeterministic to True, so that its results are never reused.
     """
 
+    mutates_tree: bool = False
+    nondeterministic: bool = False
+
     @abstractmethod
     def run(self, data: PhyloData, config: dict | None = None) -> AnalysisResult:
         """
         Execute the analysis.
 
+        Methods scoring sites independently should work on data.unique_traits,
+        weighting each pattern by data.pattern_weights, and only expand back
+        to the full set of sites (via data.pattern_inverse) when annotating
+        the result tree.
+
+        Methods should treat data.tree as read-only and report per-node results
+        in AnalysisResult.node_states (in the tree's postorder), building the
+        annotated copy once at the end with AnalysisResult.realize_tree.
+
         Args:
             data: A PhyloData object containing the tree and trait data.
             config: A dictionary containing configuration options specific
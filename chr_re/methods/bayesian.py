@@ -1,8 +1,18 @@
-"""import pymc as pm
+import importlib.util
+import logging
+import os
+import tempfile
+
+import pymc as pm
 
 from ..core.models import PhyloData, AnalysisResult
 from .base import BaseMethod
 
+logger = logging.getLogger(__name__)
+
+# NUTS runs on JAX (XLA-compiled, optionally on GPU) when NumPyro is installed
+_DEFAULT_NUTS_SAMPLER = "numpyro" if importlib.util.find_spec("numpyro") else "pymc"
+
 
 class BayesianMethod(BaseMethod):
     """
@@ -10,6 +20,8 @@ class BayesianMethod(BaseMethod):
     adhering to the BaseMethod interface.
     """
 
+    nondeterministic = True
+
     def run(self, data: PhyloData, config: dict | None = None) -> AnalysisResult:
         """
         Executes the Bayesian analysis.
@@ -21,6 +33,8 @@ class BayesianMethod(BaseMethod):
             data: A PhyloData object containing the tree and trait data.
             config: A dictionary with configuration for the model and MCMC sampler,
                     e.g., {'model_type': 'Mk', 'mcmc_params': {'draws': 10000}}.
+                    The mcmc_params are passed to pm.sample; 'nuts_sampler'
+                    defaults to 'numpyro' when NumPyro is installed.
 
         Returns:
             An AnalysisResult object containing the results.
@@ -33,12 +47,15 @@ class BayesianMethod(BaseMethod):
             config = {}
 
         model_type = config.get("model_type", "Mk")  # Default to Mk model
-        mcmc_params = config.get("mcmc_params", {})
+        mcmc_params = {"nuts_sampler": _DEFAULT_NUTS_SAMPLER, **config.get("mcmc_params", {})}
 
-        print(f"Running Bayesian analysis with model: {model_type}")
+        logger.debug("Running Bayesian analysis with model: %s", model_type)
 
         # 1. Build the PyMC model
         # pymc_model = self._build_pymc_model(data, model_type)
+        # The model should hold the traits in pm.Data containers and build
+        # transition matrices with pytensor.tensor.slinalg.expm, both of
+        # which the JAX backend can trace.
         raise NotImplementedError("Building the PyMC model is not yet implemented.")
 
         # 2. Run the MCMC sampler
@@ -53,6 +70,17 @@ class BayesianMethod(BaseMethod):
         #     annotated_tree=annotated_tree,
         #     parameters=parameters,
         #     likelihood=None,  # Typically not a single value in Bayesian stats
-        #     raw_output=trace   # Store the full MCMC trace
+        #     trace_path=_save_trace(trace)  # The trace stays on disk
         # )
-"""
+
+
+def _save_trace(trace) -> str:
+    """
+    Writes an MCMC trace to a temporary NetCDF file and returns its path, so
+    results (and ensembles holding several of them) do not keep the full
+    trace in memory. AnalysisResult.load_trace reads it back on demand.
+    """
+    fd, path = tempfile.mkstemp(suffix=".nc", prefix="chr_re_trace_")
+    os.close(fd)
+    trace.to_netcdf(path)
+    return path
@@ -1,6 +1,22 @@
-"""from ..core.models import PhyloData, AnalysisResult
+import logging
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from ..core.framework import ChromosomeReconstructionFramework
+from ..core.models import PhyloData, AnalysisResult, SharedPhyloData, _copy_tree
+from ..core.pipeline import _fingerprint
 from .base import BaseMethod
 
+logger = logging.getLogger(__name__)
+
+# Maximum number of member results an EnsembleMethod keeps for repeated runs
+_CACHE_SIZE = 32
+
 
 class EnsembleMethod(BaseMethod):
     """
@@ -8,18 +24,64 @@ class EnsembleMethod(BaseMethod):
     combining their results.
     """
 
+    def __init__(self):
+        self._member_cache: OrderedDict[tuple, AnalysisResult] = OrderedDict()
+        # Worker pool for the members, created on first use and kept until
+        # close(), so later runs find the methods imported and their numba
+        # kernels loaded
+        self._pool = None
+
+    def __getstate__(self):
+        # The pool stays with the process that created it
+        return {"_member_cache": self._member_cache, "_pool": None}
+
+    def __setstate__(self, state):
+        self._member_cache = state["_member_cache"]
+        self._pool = state["_pool"]
+
+    def close(self) -> None:
+        """Shuts down the worker pool used for the members, if any."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
     def run(self, data: PhyloData, config: dict | None = None) -> AnalysisResult:
         """
         Executes the ensemble analysis.
 
-        This method iterates through a list of other methods, runs them, and
-        aggregates their results.
+        The listed methods run one after another in this process by
+        default; as they are independent, they can instead run in worker
+        processes with 'parallel': True. Their results are aggregated in list
+        order.
 
         Args:
             data: A PhyloData object containing the tree and trait data.
             config: A dictionary containing the configuration. It must include a
                     'methods' key, which is a list of tuples. Each tuple
-                    contains a BaseMethod instance and its specific config.
+                    contains a BaseMethod instance, or the name of a
+                    registered method (e.g., 'parsimony'), and its config.
+                    With 'parallel': True and more than one method to run,
+                    the methods run in a pool of spawned worker processes,
+                    which pays off when they are expensive (starting the
+                    workers takes about a second); an optional
+                    'max_workers' key sets the pool's size when it is first
+                    created (default: the CPU count), and the pool is kept
+                    for later runs until close() is called. Inside a worker
+                    process (e.g. under Pipeline.run_many) the methods
+                    always run in-process, as nobody would close a
+                    nested pool. An optional
+                    'weights' list, one weight per method, weights the vote
+                    on ancestral states (default: equal).
+                    With an optional 'early_stop_confidence' threshold, the
+                    first method runs on its own and, if its reconstruction
+                    is already confident enough (a Fitch score of 0, or every
+                    node's best state probability at or above the
+                    threshold), the others are skipped; list the cheapest
+                    method first.
+                    A member that already ran on the same tree, traits and
+                    config in an earlier run of this ensemble is not rerun;
+                    its result is reused, unless the method is marked
+                    nondeterministic.
                     Example:
                     {
                         'methods': [
@@ -30,7 +92,11 @@ class EnsembleMethod(BaseMethod):
 
         Returns:
             An AnalysisResult object. The 'raw_output' will contain a list of
-            individual results from each method in the ensemble.
+            individual results from each method in the ensemble. The
+            'annotated_tree' is a copy of the input tree carrying the weighted
+            consensus 'state' of every node, and its 'state_support' (the
+            weighted share of votes for that state), or None if no method
+            produced an annotated tree.
 
         Raises:
             ValueError: If the config is missing the 'methods' list or if the
@@ -41,39 +107,255 @@ class EnsembleMethod(BaseMethod):
                 "EnsembleMethod requires a 'methods' list in its config."
             )
 
-        method_configs = config["methods"]
-        if not isinstance(method_configs, list):
-            raise ValueError("The 'methods' config must be a list.")
-
-        print(f"Running Ensemble analysis with {len(method_configs)} methods...")
+        methods = _validate_methods(config["methods"])
+        logger.debug("Running Ensemble analysis with %d methods...", len(methods))
 
-        all_results = []
-        for i, method_config_tuple in enumerate(method_configs):
-            if not (isinstance(method_config_tuple, tuple) and len(method_config_tuple) == 2):
-                raise ValueError(f"Item {i} in 'methods' list is not a (method, config) tuple.")
+        weights = config.get("weights")
+        if weights is not None and len(weights) != len(methods):
+            raise ValueError("The 'weights' config must give one weight per method.")
 
-            method, method_config = method_config_tuple
-            if not isinstance(method, BaseMethod):
-                raise TypeError(f"Item {i} in 'methods' list is not a valid BaseMethod instance.")
+        # Members already run on the same tree, traits and config reuse
+        # their earlier result
+        threshold = config.get("early_stop_confidence")
+        keys = [self._member_key(method, method_config) for method, method_config in methods]
+        if any(key is not None for key in keys):
+            # One fingerprint of the data serves every member
+            fingerprint = _fingerprint(data)
+            keys = [None if key is None else (fingerprint, *key) for key in keys]
+        all_results = [self._member_cache.get(key) if key is not None else None for key in keys]
+        if not (threshold is not None and methods and _is_confident_enough(all_results[0], threshold)):
+            pending = [i for i, result in enumerate(all_results) if result is None]
+            for i, result in self._run_members(data, methods, pending, config):
+                all_results[i] = result
+                self._remember(keys[i], result)
+        if threshold is not None and methods and _is_confident_enough(all_results[0], threshold):
+            all_results = all_results[:1]
 
-            print(f"---> Running method {i+1}/{len(method_configs)}: {type(method).__name__}")
-            try:
-                result = method.run(data, method_config)
-                all_results.append(result)
-            except Exception as e:
-                print(f"    Method {type(method).__name__} failed: {e}")
-                # Depending on desired behavior, you could stop or continue
-                # For now, we'll just print the error and continue
-                all_results.append({"error": str(e), "method": type(method).__name__})
+        annotated_tree = _consensus_tree(data, all_results, weights)
 
-
-        # The combination logic here is simple: just return all results.
-        # A more sophisticated implementation could average parameters,
-        # vote on ancestral states, etc.
         return AnalysisResult(
-            annotated_tree=None,  # No single tree represents the ensemble yet
-            parameters={"ensemble_size": len(all_results)},
+            annotated_tree=annotated_tree,
+            parameters={
+                "ensemble_size": len(all_results),
+                "stopped_early": len(all_results) < len(methods),
+            },
             likelihood=None,
             raw_output=all_results
         )
-"""
\ No newline at end of file
+
+    def _run_members(self, data: PhyloData, methods: list, pending: list[int], config: dict) -> list:
+        """
+        Runs the methods at the pending positions and returns (position,
+        result) pairs. When early stopping is on and the first method is
+        pending, it runs on its own first and may leave the rest unrun.
+        """
+        if not pending:
+            return []
+        threshold = config.get("early_stop_confidence")
+        probe_first = threshold is not None and pending[0] == 0
+
+        done = []
+        # A worker (e.g. of Pipeline.run_many) never starts its own pool:
+        # its copy of the ensemble is discarded without being closed
+        in_worker = multiprocessing.parent_process() is not None
+        if len(pending) == 1 or not config.get("parallel", False) or in_worker:
+            # The members share data, so only a method that writes to the
+            # tree gets a copy of it
+            for i in pending:
+                method, method_config = methods[i]
+                member_data = data
+                if getattr(method, "mutates_tree", False):
+                    member_data = PhyloData(
+                        tree=_copy_tree(data.tree),
+                        traits=data.traits,
+                        counts=data.counts,
+                        species_order=data.species_order,
+                    )
+                done.append((i, _run_one(method, member_data, method_config)))
+                if probe_first and _is_confident_enough(done[0][1], threshold):
+                    break
+            return done
+
+        # Numeric traits go to the workers through shared memory rather
+        # than one pickled copy per member
+        try:
+            shared, shm = data.to_shared()
+        except ValueError:
+            shared, shm = data, None
+        if self._pool is None:
+            # Members run in separate processes (the fits are CPU-bound); see
+            # fit_and_compare for why the workers are spawned, not forked.
+            self._pool = ProcessPoolExecutor(
+                max_workers=config.get("max_workers") or os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        executor = self._pool
+
+        def submit(i):
+            method, method_config = methods[i]
+            try:
+                return executor.submit(_run_one, method, shared, method_config)
+            except Exception as e:
+                return _failed(method, e)
+
+        def collect(i, future):
+            if not isinstance(future, Future):
+                return future
+            try:
+                return future.result()
+            except Exception as e:
+                # e.g. data or a result too deep to pickle, or a dead worker
+                if isinstance(e, BrokenProcessPool):
+                    self.close()
+                return _failed(methods[i][0], e)
+
+        try:
+            remaining = pending
+            if probe_first:
+                done.append((0, collect(0, submit(0))))
+                remaining = [] if _is_confident_enough(done[0][1], threshold) else pending[1:]
+            futures = [(i, submit(i)) for i in remaining]
+            done.extend((i, collect(i, future)) for i, future in futures)
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        return done
+
+    @staticmethod
+    def _member_key(method, config: dict | None) -> tuple | None:
+        """The method's part of a cache key: its class (not just its name) and config."""
+        if getattr(method, "nondeterministic", False):
+            return None
+        try:
+            key = (type(method), tuple(sorted((config or {}).items())))
+            hash(key)
+        except TypeError:
+            # Unhashable config values are not cached
+            return None
+        return key
+
+    def _remember(self, key: tuple | None, result) -> None:
+        # Failed members (error entries) are retried on the next run
+        if key is not None and isinstance(result, AnalysisResult):
+            self._member_cache[key] = result
+            if len(self._member_cache) > _CACHE_SIZE:
+                self._member_cache.popitem(last=False)
+
+
+def _validate_methods(method_configs) -> list[tuple]:
+    """
+    Checks the whole 'methods' list before anything runs, resolving method
+    names through the framework's registry.
+
+    Returns:
+        A list of (method instance, config) pairs.
+    """
+    if not isinstance(method_configs, list):
+        raise ValueError("The 'methods' config must be a list.")
+
+    methods = []
+    for i, method_config_tuple in enumerate(method_configs):
+        if not (isinstance(method_config_tuple, tuple) and len(method_config_tuple) == 2):
+            raise ValueError(f"Item {i} in 'methods' list is not a (method, config) tuple.")
+
+        method, method_config = method_config_tuple
+        if isinstance(method, str):
+            method = ChromosomeReconstructionFramework._get_method_instance(method)
+        if not callable(getattr(method, "run", None)):
+            raise TypeError(
+                f"Item {i} in 'methods' list does not provide a run(data, config) method."
+            )
+        methods.append((method, method_config))
+    return methods
+
+
+def _run_one(method: BaseMethod, data: PhyloData | SharedPhyloData, config: dict | None):
+    """
+    Runs one ensemble member in a worker process. A failing method yields an
+    error entry instead of aborting the rest of the ensemble.
+    """
+    shm = None
+    if isinstance(data, SharedPhyloData):
+        data, shm = data.attach()
+    logger.debug("---> Running method: %s", type(method).__name__)
+    try:
+        return method.run(data, config)
+    except Exception as e:
+        return _failed(method, e)
+    finally:
+        if shm is not None:
+            del data
+            try:
+                shm.close()
+            except BufferError:
+                # Something still views the block; the mapping goes with the process
+                pass
+
+
+def _failed(method, error: Exception) -> dict:
+    """The error entry that stands in for a member that failed."""
+    method_name = type(method).__name__
+    logger.warning("Method %s failed: %s", method_name, error)
+    return {"error": str(error), "method": method_name}
+
+
+def _is_confident_enough(result, threshold: float) -> bool:
+    """
+    Tells whether one member's reconstruction leaves nothing for the rest of
+    the ensemble to settle: a parsimony reconstruction without homoplasy, or
+    state probabilities whose best value reaches the threshold at every node.
+    """
+    if not isinstance(result, AnalysisResult):
+        return False
+    if result.parameters.get("parsimony_score") == 0:
+        return True
+    if result.annotated_tree is None:
+        return False
+    for node in result.annotated_tree.traverse():
+        probs = getattr(node, "state_probs", None)
+        if not probs or max(probs.values()) < threshold:
+            return False
+    return True
+
+
+def _consensus_tree(data: PhyloData, all_results: list, weights: list | None):
+    """
+    Combines the ancestral states of the members' annotated trees by a
+    weighted vote. Each member contributes a (n_nodes, n_states) layout —
+    its 'state_probs' per node when present, else a one-hot of its 'state'
+    — and the stacked layouts are averaged in a single reduction.
+    """
+    voters = [
+        (result, 1.0 if weights is None else weights[i])
+        for i, result in enumerate(all_results)
+        if isinstance(result, AnalysisResult) and result.annotated_tree is not None
+    ]
+    if not voters:
+        return None
+
+    # Members annotate copies of the same tree, so nodes line up by position
+    member_nodes = [list(result.annotated_tree.traverse("preorder")) for result, _ in voters]
+    state_values = sorted({
+        state
+        for nodes in member_nodes
+        for node in nodes
+        for state in (getattr(node, "state_probs", None) or {node.state: 1.0})
+    })
+    state_index = {state: j for j, state in enumerate(state_values)}
+
+    stack = np.zeros((len(voters), len(member_nodes[0]), len(state_values)))
+    for m, nodes in enumerate(member_nodes):
+        for i, node in enumerate(nodes):
+            probs = getattr(node, "state_probs", None) or {node.state: 1.0}
+            for state, p in probs.items():
+                stack[m, i, state_index[state]] = p
+
+    support = np.average(stack, axis=0, weights=[w for _, w in voters])
+    consensus = np.argmax(support, axis=-1)
+
+    tree = _copy_tree(data.tree)
+    for i, node in enumerate(tree.traverse("preorder")):
+        node.add_feature("state", state_values[consensus[i]])
+        node.add_feature("state_support", float(support[i, consensus[i]]))
+    return tree
@@ -1,11 +1,28 @@
-"""from ..core.models import PhyloData, AnalysisResult
+import logging
+import math
+
+import numpy as np
+from numba import njit
+
+from ..core.models import PhyloData, AnalysisResult
 from .base import BaseMethod
 
+logger = logging.getLogger(__name__)
+
+# Shortest branch the BM kernels see; a zero-length branch would make a
+# contrast's variance zero
+_MIN_BRANCH_LENGTH = 1e-8
+
 
 class MaximumLikelihoodMethod(BaseMethod):
     """
     Implements Maximum Likelihood (ML) ancestral state reconstruction for
     continuous characters, adhering to the BaseMethod interface.
+
+    Model fits (_calculate_bm, and _calculate_ou to come) return a
+    log-likelihood, accumulated as a sum of per-node log terms in the
+    postorder kernels. Never multiply per-node likelihoods (e.g. np.prod):
+    the product underflows double precision on trees of a few hundred tips.
     """
 
     def run(self, data: PhyloData, config: dict | None = None) -> AnalysisResult:
@@ -21,35 +38,152 @@ class MaximumLikelihoodMethod(BaseMethod):
             An AnalysisResult object containing the results.
 
         Raises:
-            NotImplementedError: As the core algorithms are not yet implemented.
-            ValueError: If the model in the config is not supported.
+            NotImplementedError: For the OU model, which is not yet implemented.
+            ValueError: If the model in the config is not supported, or the
+                        data cannot be fit (see _calculate_bm).
         """
         if config is None or "model" not in config:
             raise ValueError("A model (e.g., 'BM', 'OU') must be specified in the config.")
 
         model = config["model"]
-        print(f"Running Maximum Likelihood analysis with model: {model}")
+        logger.debug("Running Maximum Likelihood analysis with model: %s", model)
 
         # Here, you would dispatch to the correct internal method based on the model
         if model == "BM":
-            # This would call the actual Brownian Motion implementation
-            # result = self._calculate_bm(data.tree, data.traits)
-            raise NotImplementedError("Brownian Motion (BM) model not implemented yet.")
+            log_likelihood, sigma2, node_means = self._calculate_bm(data)
+            result = AnalysisResult(
+                annotated_tree=None,
+                parameters={"model_name": "BM", "sigma_sq": sigma2, "num_params": 1},
+                likelihood=log_likelihood,
+                node_states=node_means,
+            )
+            result.annotated_tree = result.realize_tree(data.tree)
+            return result
         elif model == "OU":
             # This would call the actual Ornstein-Uhlenbeck implementation
-            # result = self._calculate_ou(data.tree, data.traits)
+            # log_likelihood, params, node_means = self._calculate_ou(data)
             raise NotImplementedError(
                 "Ornstein-Uhlenbeck (OU) model not implemented yet."
             )
         else:
             raise ValueError(f"Unsupported model for Maximum Likelihood: {model}")
 
-        # The actual implementation would create and return a proper AnalysisResult.
-        # For now, this is a placeholder.
-        # return AnalysisResult(
-        #     annotated_tree=annotated_tree,
-        #     parameters=optimized_params,
-        #     likelihood=log_likelihood,
-        #     raw_output=raw_results
-        # )
-"""
+    def _calculate_bm(self, data: PhyloData):
+        """
+        Fits a Brownian motion model to the first trait column by
+        independent contrasts, in one postorder and one preorder pass over
+        the tree arrays of data (see _bm_contrasts and _bm_ancestors).
+
+        The rate is the REML estimate, the sum of the squared standardized
+        contrasts over their number, and the likelihood is the restricted
+        (contrast) likelihood at that rate.
+
+        Zero-length branches are lengthened to _MIN_BRANCH_LENGTH, so tips
+        joined by one (e.g. duplicate samples) still give a contrast.
+
+        Returns:
+            A tuple (log_likelihood, sigma2, node_means), where node_means
+            holds the ML ancestral state of every node in postorder (the
+            observed value at the tips).
+
+        Raises:
+            ValueError: If the tree has fewer than two tips, or the trait
+                        does not vary across them (the rate would be zero).
+        """
+        child_ptr = data.postorder_child_ptr
+        dist = np.maximum(data.postorder_dist, _MIN_BRANCH_LENGTH)
+        tip_values = np.full(len(data.postorder_names), np.nan)
+        tip_values[data.leaf_positions] = data.tip_values()
+
+        ss, sum_log_var, n_contrasts, means, variances = _bm_contrasts(
+            tip_values, child_ptr, data.postorder_children, dist
+        )
+        if n_contrasts == 0:
+            raise ValueError("Brownian motion needs a tree with at least two tips.")
+        if ss == 0.0:
+            raise ValueError("The trait is the same at every tip; the Brownian motion rate would be zero.")
+        sigma2 = ss / n_contrasts
+        log_likelihood = -0.5 * (
+            n_contrasts * math.log(2 * math.pi * sigma2) + sum_log_var + n_contrasts
+        )
+        node_means = _bm_ancestors(means, variances, data.postorder_parent, child_ptr, dist)
+        return log_likelihood, sigma2, node_means
+
+
+@njit(cache=True)
+def _bm_contrasts(tip_values, child_ptr, children, dist):
+    """
+    Felsenstein's pruning for Brownian motion at unit rate, over the
+    postorder arrays. Each node gets the mean and variance of its subtree's
+    estimate of its state; a node with several children folds them in one at
+    a time, each fold giving one contrast.
+
+    Returns:
+        A tuple (ss, sum_log_var, n_contrasts, means, variances): the sum of
+        squared standardized contrasts, the sum of the logs of their
+        variances, their number, and the per-node means and variances.
+    """
+    n_nodes = tip_values.shape[0]
+    means = np.empty(n_nodes)
+    variances = np.empty(n_nodes)
+    ss = 0.0
+    sum_log_var = 0.0
+    n_contrasts = 0
+    for node in range(n_nodes):
+        start = child_ptr[node]
+        end = child_ptr[node + 1]
+        if start == end:
+            means[node] = tip_values[node]
+            variances[node] = 0.0
+            continue
+        c = children[start]
+        mean = means[c]
+        var = variances[c] + dist[c]
+        for k in range(start + 1, end):
+            c = children[k]
+            other_var = variances[c] + dist[c]
+            total = var + other_var
+            diff = mean - means[c]
+            ss += diff * diff / total
+            sum_log_var += math.log(total)
+            n_contrasts += 1
+            mean = (mean * other_var + means[c] * var) / total
+            var = var * other_var / total
+        means[node] = mean
+        variances[node] = var
+    return ss, sum_log_var, n_contrasts, means, variances
+
+
+@njit(cache=True)
+def _bm_ancestors(means, variances, parents, child_ptr, dist):
+    """
+    The preorder pass after _bm_contrasts: combines each node's subtree
+    estimate with the estimate from the rest of the tree, in precision form,
+    so a parent's full-tree estimate minus the child's own contribution is
+    the message passed down that branch.
+    """
+    n_nodes = means.shape[0]
+    estimates = means.copy()
+    precision = np.empty(n_nodes)
+    for node in range(n_nodes - 1, -1, -1):
+        p = parents[node]
+        if child_ptr[node] == child_ptr[node + 1]:
+            # Tips keep their observed value
+            precision[node] = np.inf
+            continue
+        own = 1.0 / variances[node]
+        if p < 0:
+            precision[node] = own
+            continue
+        branch = variances[node] + dist[node]
+        rest = precision[p] - 1.0 / branch
+        if rest <= 0.0:
+            # The parent knows nothing beyond this subtree
+            precision[node] = own
+            continue
+        rest_mean = (precision[p] * estimates[p] - means[node] / branch) / rest
+        from_above = 1.0 / (1.0 / rest + dist[node])
+        precision[node] = own + from_above
+        estimates[node] = (means[node] * own + rest_mean * from_above) / precision[node]
+    return estimates
+
@@ -1,6 +1,22 @@
-"""from ..core.models import PhyloData, AnalysisResult
+import logging
+
+import numpy as np
+from numba import njit
+
+from ..core.models import PhyloData, AnalysisResult
 from .base import BaseMethod
 
+logger = logging.getLogger(__name__)
+
+# Multiplying a single-bit word by this de Bruijn constant puts a distinct
+# pattern in its top six bits, which _DEBRUIJN_INDEX maps back to the bit's
+# position; this finds the lowest set bit without looping over bits.
+_DEBRUIJN_MAGIC = np.uint64(0x03F79D71B4CB0A89)
+_DEBRUIJN_INDEX = np.empty(64, dtype=np.int64)
+for _bit in range(64):
+    _DEBRUIJN_INDEX[((_DEBRUIJN_MAGIC.item() << _bit) & 0xFFFFFFFFFFFFFFFF) >> 58] = _bit
+del _bit
+
 
 class ParsimonyMethod(BaseMethod):
     """
@@ -8,45 +24,53 @@ class ParsimonyMethod(BaseMethod):
     BaseMethod interface.
     """
 
-    def _fitch(self, tree, traits):
-        """Performs Fitch's algorithm."""
-        parsimony_score = 0
-
-        # First pass: post-order traversal (from tips to root)
-        for node in tree.traverse("postorder"):
-            if node.is_leaf():
-                tip_name = node.name
-                state = traits.loc[tip_name].iloc[0] # Get the first trait value
-                node.add_feature("states", {state})
-            else:
-                # Union of child states for nodes with one child
-                if len(node.children) == 1:
-                    child_states = node.children[0].states
-                    node.add_feature("states", child_states)
-                else: # Intersection for nodes with two or more children
-                    child_states_sets = [child.states for child in node.children]
-                    intersection = set.intersection(*child_states_sets)
-                    if intersection:
-                        node.add_feature("states", intersection)
-                    else:
-                        union = set.union(*child_states_sets)
-                        node.add_feature("states", union)
-                        parsimony_score += 1
-
-        # Second pass: pre-order traversal (from root to tips)
-        for node in tree.traverse("preorder"):
-            if node.is_root():
-                # For the root, just pick one state if multiple are possible
-                node.add_feature("state", list(node.states)[0])
-            else:
-                parent_state = node.up.state
-                if parent_state in node.states:
-                    node.add_feature("state", parent_state)
-                else:
-                    # If parent state is not in the possible set, pick one
-                    node.add_feature("state", list(node.states)[0])
-        
-        return tree, parsimony_score
+    def _fitch(self, data):
+        """
+        Performs Fitch's algorithm.
+
+        Each node's candidate state set is a bitset over the distinct tip
+        states, stored as rows of a uint64 array, so both passes run as
+        compiled word-wide AND/OR operations. The postorder arrays are the
+        ones PhyloData built when it was created, so the tree itself is not
+        walked here.
+
+        Returns:
+            A tuple (node_states, state_sets, parsimony_score), where the
+            chosen states (an array) and candidate state sets follow the
+            tree's postorder.
+        """
+        child_ptr = data.postorder_child_ptr
+        children = data.postorder_children
+        parents = data.postorder_parent
+
+        # Encode the tip states as one bit each in their node's bitset
+        leaf_positions = data.leaf_positions
+        state_values, state_codes = np.unique(data.tip_values(), return_inverse=True)
+        state_codes = state_codes.astype(np.int64)
+        masks = np.zeros((len(parents), (len(state_values) + 63) // 64), dtype=np.uint64)
+        masks[leaf_positions, state_codes // 64] = np.left_shift(
+            np.uint64(1), (state_codes % 64).astype(np.uint64)
+        )
+
+        # First pass: post-order (from tips to root), then second pass:
+        # pre-order (from root to tips). The kernels are compiled but serial,
+        # like event_detection's, so no numba thread pool is left running in
+        # a process that may fork later. Up to 64 states fit in a single
+        # word, which is the usual case for chromosome counts, so that case
+        # gets kernels without the inner loop over blocks. Those words are
+        # narrowed to the smallest unsigned type holding every state bit
+        # (uint8 for up to 8 states), so the passes move fewer bytes; numba
+        # compiles the kernels once per word type.
+        if masks.shape[1] == 1:
+            word_type = np.min_scalar_type(1 << (len(state_values) - 1))
+            words = masks[:, 0].astype(word_type)
+            parsimony_score, chosen = _fitch_kernel_word(words, child_ptr, children, parents)
+            masks = words.reshape(-1, 1)
+        else:
+            parsimony_score, chosen = _fitch_kernel(masks, child_ptr, children, parents)
+
+        state_sets = _decode(masks, state_values)
+        return state_values[chosen], state_sets, parsimony_score
 
     def run(self, data: PhyloData, config: dict | None = None) -> AnalysisResult:
         """
@@ -58,22 +82,157 @@ class ParsimonyMethod(BaseMethod):
             )
 
         algorithm = config["algorithm"]
-        print(f"Running Parsimony analysis with algorithm: {algorithm}")
-
-        # Make a deep copy of the tree to avoid modifying the original data object
-        tree_copy = data.tree.copy("newick-extended")
+        logger.debug("Running Parsimony analysis with algorithm: %s", algorithm)
 
         if algorithm == "Fitch":
-            annotated_tree, score = self._fitch(tree_copy, data.traits)
-            return AnalysisResult(
-                annotated_tree=annotated_tree,
+            # Fitch works on the caller's tree by reference; the annotated
+            # copy is only built once the states are known.
+            node_states, state_sets, score = self._fitch(data)
+            result = AnalysisResult(
+                annotated_tree=None,
                 parameters={"parsimony_score": score, "model_name": "Fitch Parsimony"},
-                likelihood=None  # Parsimony does not have a likelihood
+                likelihood=None,  # Parsimony does not have a likelihood
+                node_states=node_states,
             )
+            result.annotated_tree = result.realize_tree(data.tree, states=state_sets)
+            return result
         elif algorithm == "Sankoff":
             if "cost_matrix" not in config:
                 raise ValueError("Sankoff algorithm requires a 'cost_matrix' in the config.")
             raise NotImplementedError("Sankoff algorithm not implemented yet.")
         else:
             raise ValueError(f"Unsupported parsimony algorithm: {algorithm}")
-"""
+
+
+@njit(cache=True)
+def _fitch_kernel(masks, child_ptr, children, parents):
+    """Runs both Fitch passes in one compiled call; returns (score, chosen codes)."""
+    score = _fitch_postorder(masks, child_ptr, children)
+    return score, _fitch_preorder(masks, parents)
+
+
+@njit(cache=True)
+def _fitch_kernel_word(words, child_ptr, children, parents):
+    """_fitch_kernel for state sets that fit in one unsigned word each."""
+    score = _fitch_postorder_word(words, child_ptr, children)
+    return score, _fitch_preorder_word(words, parents)
+
+
+@njit(cache=True)
+def _fitch_postorder(masks, child_ptr, children):
+    """
+    Fills the state bitsets of the internal nodes, which come after their
+    children in postorder. A node with one child copies its set; otherwise
+    the children's sets are intersected, falling back to their union (and
+    adding one to the score) when the intersection is empty.
+    """
+    n_nodes, n_blocks = masks.shape
+    score = 0
+    for node in range(n_nodes):
+        start = child_ptr[node]
+        end = child_ptr[node + 1]
+        if start == end:
+            continue
+        empty = True
+        for b in range(n_blocks):
+            inter = masks[children[start], b]
+            for c in range(start + 1, end):
+                inter &= masks[children[c], b]
+            masks[node, b] = inter
+            if inter != 0:
+                empty = False
+        if empty:
+            for b in range(n_blocks):
+                union = masks[children[start], b]
+                for c in range(start + 1, end):
+                    union |= masks[children[c], b]
+                masks[node, b] = union
+            score += 1
+    return score
+
+
+@njit(cache=True)
+def _fitch_preorder(masks, parents):
+    """
+    Picks one state code per node, walking the postorder indices backwards so
+    every parent is handled before its children. A node keeps its parent's
+    state when its set allows it and otherwise takes its lowest state.
+    """
+    n_nodes = masks.shape[0]
+    chosen = np.empty(n_nodes, dtype=np.int64)
+    one = np.uint64(1)
+    for node in range(n_nodes - 1, -1, -1):
+        p = parents[node]
+        if p >= 0:
+            code = chosen[p]
+            if (masks[node, code // 64] >> np.uint64(code % 64)) & one:
+                chosen[node] = code
+                continue
+        chosen[node] = _lowest_code(masks[node])
+    return chosen
+
+
+@njit(cache=True)
+def _fitch_postorder_word(words, child_ptr, children):
+    """_fitch_postorder for state sets that fit in one unsigned word each."""
+    score = 0
+    for node in range(words.shape[0]):
+        start = child_ptr[node]
+        end = child_ptr[node + 1]
+        if start == end:
+            continue
+        inter = words[children[start]]
+        union = inter
+        for c in range(start + 1, end):
+            word = words[children[c]]
+            inter &= word
+            union |= word
+        if inter != 0:
+            words[node] = inter
+        else:
+            words[node] = union
+            score += 1
+    return score
+
+
+@njit(cache=True)
+def _fitch_preorder_word(words, parents):
+    """_fitch_preorder for state sets that fit in one unsigned word each."""
+    n_nodes = words.shape[0]
+    chosen = np.empty(n_nodes, dtype=np.int64)
+    one = np.uint64(1)
+    for node in range(n_nodes - 1, -1, -1):
+        word = words[node]
+        p = parents[node]
+        parent_bit = (one << np.uint64(chosen[p])) if p >= 0 else np.uint64(0)
+        preferred = word & parent_bit
+        chosen[node] = _lowest_bit(preferred if preferred != 0 else np.uint64(word))
+    return chosen
+
+
+@njit(cache=True)
+def _lowest_code(mask):
+    """Returns the index of the lowest set bit in a bitset."""
+    for b in range(mask.shape[0]):
+        word = mask[b]
+        if word != 0:
+            return b * 64 + _lowest_bit(word)
+    return -1
+
+
+@njit(cache=True)
+def _lowest_bit(word):
+    """Returns the index of the lowest set bit of a non-zero uint64 word."""
+    isolated = word & (~word + np.uint64(1))
+    return _DEBRUIJN_INDEX[(isolated * _DEBRUIJN_MAGIC) >> np.uint64(58)]
+
+
+def _decode(masks, state_values):
+    """
+    Turns every node's bitset back into a set of states, unpacking all the
+    bits in one call rather than one node at a time.
+    """
+    bits = np.unpackbits(masks.view(np.uint8), axis=1, bitorder="little")
+    nodes, codes = np.nonzero(bits)
+    bounds = np.searchsorted(nodes, np.arange(1, len(masks))).tolist()
+    return [set(states.tolist()) for states in np.split(state_values[codes], bounds)]
@@ -0,0 +1,21 @@
+"""Example: loading the bundled simulated tree and chromosome counts.
+"""
+
+import os
+
+from chr_re.core.data_loader import load_phylo_data
+
+EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+if __name__ == '__main__':
+    print("--- Example Data Loading ---")
+
+    data = load_phylo_data(
+        os.path.join(EXAMPLES_DIR, "simulated_tree.nwk"),
+        os.path.join(EXAMPLES_DIR, "simulated_counts.csv"),
+        tree_format=1,
+        counts_col="chromosome_number",
+    )
+    print(f"--> Loaded {len(data.species_order)} species: {data.species_order}")
+    print(f"--> Chromosome counts: {data.counts.tolist()}")
@@ -0,0 +1,47 @@
+"""Example: detecting significant chromosome number changes on a tree.
+"""
+
+from ete3 import Tree
+
+from chr_re.analysis.event_detection import detect_significant_events
+from chr_re.core.models import AnalysisResult
+
+
+if __name__ == '__main__':
+    print("--- Example Event Detection ---")
+
+    # 1. Create a dummy AnalysisResult that contains an annotated tree
+    #    Each node carries its reconstructed state, as set by ParsimonyMethod.
+    annotated_tree = Tree("(A:0.1,B:0.2,(C:0.3,D:0.4)E:0.5)F;", format=1)
+    for node, state in zip(annotated_tree.traverse("preorder"), [10, 10, 12, 14, 14, 20]):
+        node.add_feature("state", state)
+
+    good_result = AnalysisResult(
+        annotated_tree=annotated_tree,
+        parameters={"some_param": 1},
+        likelihood=-50.0
+    )
+
+    print("\nAnalyzing a result with an annotated tree:")
+    try:
+        events = detect_significant_events(good_result, config={"change_threshold": 3})
+        print(f"--> Detected events: {events}")
+    except ValueError as e:
+        print(f"Caught unexpected error: {e}")
+
+
+    # 2. Create a dummy result WITHOUT an annotated tree
+    bad_result = AnalysisResult(
+        annotated_tree=None,
+        parameters={"some_param": 1},
+        likelihood=-50.0
+    )
+
+    print("\nAnalyzing a result without an annotated tree (expected to fail):")
+    try:
+        events = detect_significant_events(bad_result)
+        print(f"--> Detected events: {events}")
+    except ValueError as e:
+        print(f"Caught expected error: {e}")
+
+    print("\nEvent detection structure implemented.")
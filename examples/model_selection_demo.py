@@ -0,0 +1,39 @@
+"""Example: comparing fitted models by AIC.
+"""
+
+from chr_re.analysis.model_selection import compare_models, to_json
+from chr_re.core.models import AnalysisResult
+
+
+if __name__ == '__main__':
+    print("--- Example Model Comparison ---")
+
+    # 1. Create a list of dummy AnalysisResult objects
+    #    Simulating a comparison between a simple (BM) and a complex (OU) model.
+    results_list = [
+        AnalysisResult(
+            annotated_tree=None,
+            parameters={"model_name": "BM", "num_params": 1, "sigma_sq": 0.1},
+            likelihood=-55.4, # Lower likelihood
+        ),
+        AnalysisResult(
+            annotated_tree=None,
+            parameters={"model_name": "OU", "num_params": 3, "alpha": 0.2, "sigma_sq": 0.08},
+            likelihood=-50.1, # Higher likelihood, but more params
+        ),
+        AnalysisResult(
+            annotated_tree=None,
+            parameters={"parsimony_score": 10}, # No likelihood, should be skipped
+            likelihood=None,
+        ),
+    ]
+
+    print(f"Comparing {len(results_list)} model results...")
+    try:
+        comparison = compare_models(results_list)
+        print("--> Comparison Result:")
+        print(to_json(comparison))
+    except ValueError as e:
+        print(f"Caught expected error: {e}")
+
+    print("\nModel selection structure implemented.")
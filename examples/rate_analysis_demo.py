@@ -0,0 +1,55 @@
+"""Example: extracting evolutionary rates from analysis results.
+"""
+
+from chr_re.analysis.rate_analysis import calculate_evolutionary_rates
+from chr_re.core.models import AnalysisResult
+
+
+if __name__ == '__main__':
+    print("--- Example Rate Analysis ---")
+
+    # 1. Create a dummy AnalysisResult, simulating one from a Maximum Likelihood run
+    ml_result = AnalysisResult(
+        annotated_tree=None,  # Dummy data
+        parameters={"sigma_sq": 0.05, "aic": 102.3}, # ML result might have sigma_sq
+        likelihood= -51.15
+    )
+
+    print("\nAnalyzing a simulated ML result:")
+    try:
+        ml_rates = calculate_evolutionary_rates(ml_result)
+        print(f"--> Calculated rates: {ml_rates}")
+    except ValueError as e:
+        print(f"Caught expected error: {e}")
+
+
+    # 2. Create another dummy result, simulating one from a Bayesian run
+    bayesian_result = AnalysisResult(
+        annotated_tree=None, # Dummy data
+        parameters={"rate_posterior": {'mean': 0.06, 'hpd_95': [0.02, 0.10]}},
+        raw_output=None # Dummy data
+    )
+
+    print("\nAnalyzing a simulated Bayesian result:")
+    try:
+        bayesian_rates = calculate_evolutionary_rates(bayesian_result)
+        print(f"--> Calculated rates: {bayesian_rates}")
+    except ValueError as e:
+        print(f"Caught expected error: {e}")
+
+
+    # 3. Create a result that will fail, simulating one from Parsimony
+    parsimony_result = AnalysisResult(
+        annotated_tree=None, # Dummy data
+        parameters={"parsimony_score": 15}, # Parsimony doesn't estimate rate
+        likelihood=None
+    )
+
+    print("\nAnalyzing a simulated Parsimony result (expected to fail):")
+    try:
+        parsimony_rates = calculate_evolutionary_rates(parsimony_result)
+        print(f"--> Calculated rates: {parsimony_rates}")
+    except ValueError as e:
+        print(f"Caught expected error: {e}")
+
+    print("\nRate analysis structure implemented.")
@@ -0,0 +1,24 @@
+"""Example: reconstructing ancestral chromosome numbers through the framework.
+"""
+
+import os
+
+from chr_re.core.framework import ChromosomeReconstructionFramework
+
+EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+if __name__ == '__main__':
+    print("--- Example Ancestral Reconstruction ---")
+
+    # Leaving the block shuts down any worker pools the methods started
+    with ChromosomeReconstructionFramework() as framework:
+        framework.load_data(
+            os.path.join(EXAMPLES_DIR, "simulated_tree.nwk"),
+            os.path.join(EXAMPLES_DIR, "simulated_counts.csv"),
+            tree_format=1,
+            counts_col="chromosome_number",
+        )
+        result = framework.reconstruct_ancestors(method="parsimony", algorithm="Fitch")
+    print(f"--> Parsimony score: {result.parameters['parsimony_score']}")
+    print(f"--> Ancestral states: {result.node_states}")
@@ -21,14 +21,11 @@ setup(
         "Intended Audience :: Science/Research",
         "License :: OSI Approved :: MIT License", # Choose your license
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
-        "Programming Language :: Python :: 3.10",
         "Programming Language :: Python :: 3.11",
         "Operating System :: OS Independent",
         "Topic :: Scientific/Engineering :: Bio-Informatics",
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.11",
     install_requires=requirements,
     extras_require={
         "dev": ["pytest>=6.0", "flake8", "black", "mypy"],
@@ -0,0 +1,270 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from ete3 import Tree
+
+from chr_re.core.data_loader import load_phylo_data
+from chr_re.core.models import AnalysisResult, PhyloData
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLES_DIR = os.path.join(BASE_DIR, "examples")
+
+
+class TestLoadPhyloData:
+    """
+    Tests for loading a tree and its trait table into a PhyloData object.
+    """
+    def setup_method(self, method):
+        self.tree_path = os.path.join(EXAMPLES_DIR, "simulated_tree.nwk")
+        self.counts_path = os.path.join(EXAMPLES_DIR, "simulated_counts.csv")
+
+    def _load(self, counts_path=None, **kwargs):
+        return load_phylo_data(
+            self.tree_path,
+            counts_path or self.counts_path,
+            tree_format=1,
+            counts_col="chromosome_number",
+            **kwargs,
+        )
+
+    def test_traits_follow_tree_tip_order(self):
+        data = self._load()
+        assert list(data.traits.index) == data.tree.get_leaf_names()
+        assert list(data.traits.columns) == ["chromosome_number"]
+        assert list(data.traits["chromosome_number"]) == [10, 12, 14, 16]
+
+    def test_counts_are_parsed_as_int32(self):
+        data = self._load()
+        assert data.traits["chromosome_number"].dtype == np.int32
+
+    def test_counts_array_follows_species_order(self):
+        data = self._load()
+        assert data.species_order == data.tree.get_leaf_names()
+        assert data.counts.dtype == np.int32
+        assert data.counts.flags["C_CONTIGUOUS"]
+        assert list(data.counts) == [10, 12, 14, 16]
+
+    def test_species_share_categorical_codes_with_tips(self):
+        data = self._load()
+        assert isinstance(data.traits.index, pd.CategoricalIndex)
+        codes = [leaf.species_id for leaf in data.tree.iter_leaves()]
+        assert codes == list(data.traits.index.codes)
+
+    def test_counts_are_parsed_as_int32_with_default_engine(self):
+        data = self._load(engine="c")
+        assert data.traits["chromosome_number"].dtype == np.int32
+
+    def test_missing_count_names_species(self, tmp_path):
+        counts_path = tmp_path / "counts.csv"
+        counts_path.write_text("species,chromosome_number\nA,10\nB,\nC,14\nD,16\n")
+
+        with pytest.raises(ValueError, match="'chromosome_number' has missing values for species: \\['B'\\]"):
+            self._load(str(counts_path))
+
+    @pytest.mark.parametrize("engine", [None, "c"])
+    def test_fractional_count_names_species(self, tmp_path, engine):
+        counts_path = tmp_path / "counts.csv"
+        counts_path.write_text("species,chromosome_number\nA,10.5\nB,12\nC,14\nD,16\n")
+        kwargs = {"engine": engine} if engine else {}
+
+        with pytest.raises(ValueError, match="non-integer values for species: \\['A'\\]"):
+            self._load(str(counts_path), use_cache=False, **kwargs)
+
+    def test_callable_usecols_and_skiprows_are_accepted(self, tmp_path):
+        counts_path = tmp_path / "counts.csv"
+        counts_path.write_text("generated by a script\nspecies,chromosome_number,note\nA,10,x\nB,12,y\nC,14,z\nD,16,w\n")
+
+        data = self._load(str(counts_path), usecols=lambda c: c != "note", skiprows=1)
+        assert list(data.traits["chromosome_number"]) == [10, 12, 14, 16]
+
+    def test_species_in_a_different_order_are_accepted(self, tmp_path):
+        counts_path = tmp_path / "counts.csv"
+        pd.DataFrame(
+            {"species": ["D", "C", "B", "A"], "chromosome_number": [16, 14, 12, 10]}
+        ).to_csv(counts_path, index=False)
+
+        data = self._load(str(counts_path))
+        assert list(data.traits["chromosome_number"]) == [10, 12, 14, 16]
+
+    def test_species_mismatch_is_reported(self, tmp_path):
+        counts_path = tmp_path / "counts.csv"
+        pd.DataFrame(
+            {"species": ["A", "B", "C", "X"], "chromosome_number": [10, 12, 14, 20]}
+        ).to_csv(counts_path, index=False)
+
+        with pytest.raises(ValueError, match="not in tree: \\['X'\\]"):
+            self._load(str(counts_path))
+
+    def test_duplicate_species_raise(self, tmp_path):
+        counts_path = tmp_path / "counts.csv"
+        pd.DataFrame(
+            {"species": ["A", "B", "C", "D", "D"], "chromosome_number": [10, 12, 14, 16, 18]}
+        ).to_csv(counts_path, index=False)
+
+        with pytest.raises(ValueError, match="Duplicate species"):
+            self._load(str(counts_path))
+
+    def test_extra_columns_are_not_loaded(self, tmp_path):
+        counts_path = tmp_path / "counts.csv"
+        pd.DataFrame(
+            {
+                "other_info": ["w", "x", "y", "z"],
+                "species": ["A", "B", "C", "D"],
+                "chromosome_number": [10, 12, 14, 16],
+            }
+        ).to_csv(counts_path, index=False)
+
+        data = self._load(str(counts_path))
+        assert list(data.traits.columns) == ["chromosome_number"]
+
+    def test_usecols_without_required_columns_raises(self):
+        with pytest.raises(ValueError, match="usecols"):
+            self._load(usecols=["species"])
+
+    def test_positional_usecols_are_accepted(self):
+        data = self._load(usecols=[0, 1])
+        assert list(data.traits["chromosome_number"]) == [10, 12, 14, 16]
+
+    def test_nrows_is_forwarded_to_the_full_read(self):
+        data = self._load(nrows=4)
+        assert len(data.traits) == 4
+
+    def test_repeated_loads_are_cached_as_independent_copies(self):
+        first = self._load()
+        first.traits.iloc[0, 0] = 99
+        first.tree.add_feature("marker", True)
+
+        second = self._load()
+        assert second.traits.iloc[0, 0] == 10
+        assert not hasattr(second.tree, "marker")
+
+    def test_deep_trees_load_from_the_cache(self, tmp_path):
+        depth = 3000
+        tree_path = tmp_path / "deep.nwk"
+        tree_path.write_text("(" * depth + "t0:1" + "".join(f",t{i}:1):1" for i in range(1, depth + 1)) + ";")
+        counts_path = tmp_path / "counts.csv"
+        counts_path.write_text("species,count\n" + "".join(f"t{i},{i % 5 + 2}\n" for i in range(depth + 1)))
+
+        first = load_phylo_data(str(tree_path), str(counts_path), tree_format=1)
+        second = load_phylo_data(str(tree_path), str(counts_path), tree_format=1)
+        assert second.tree is not first.tree
+        assert second.species_order == first.species_order
+
+    def test_cache_notices_modified_files(self, tmp_path):
+        counts_path = tmp_path / "counts.csv"
+        counts_path.write_text("species,chromosome_number\nA,10\nB,12\nC,14\nD,16\n")
+        assert self._load(str(counts_path)).traits.iloc[0, 0] == 10
+
+        counts_path.write_text("species,chromosome_number\nA,11\nB,12\nC,14\nD,16\n")
+        os.utime(counts_path, ns=(0, 1))
+        assert self._load(str(counts_path)).traits.iloc[0, 0] == 11
+
+    def test_missing_tree_file_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError, match="Tree file"):
+            load_phylo_data(str(tmp_path / "missing.nwk"), self.counts_path)
+
+    def test_invalid_tree_format_raises(self):
+        with pytest.raises(ValueError, match="tree_format"):
+            load_phylo_data(self.tree_path, self.counts_path, tree_format="newick")
+
+    def test_invalid_tree_backend_raises(self):
+        with pytest.raises(ValueError, match="tree_backend"):
+            self._load(tree_backend="dendropy")
+
+    def test_skbio_backend_matches_ete3(self):
+        pytest.importorskip("skbio")
+        data = self._load(tree_backend="skbio", use_cache=False)
+        expected = self._load(use_cache=False)
+        assert data.tree.get_leaf_names() == expected.tree.get_leaf_names()
+        assert list(data.counts) == list(expected.counts)
+
+    def test_unknown_read_csv_kwargs_raise(self, tmp_path):
+        with pytest.raises(TypeError, match="not_an_option"):
+            load_phylo_data(str(tmp_path / "missing.nwk"), self.counts_path, not_an_option=1)
+
+    def test_missing_counts_column_raises(self):
+        with pytest.raises(ValueError, match="Counts column"):
+            load_phylo_data(self.tree_path, self.counts_path, tree_format=1)
+
+
+def test_phylo_data_compresses_site_patterns():
+    traits = pd.DataFrame(
+        {"s1": [1, 2, 3], "s2": [4, 5, 6], "s3": [1, 2, 3], "s4": [1, 2, 3]},
+        index=["A", "B", "C"],
+    )
+    data = PhyloData(tree=None, traits=traits)
+
+    assert data.unique_traits.shape == (3, 2)
+    assert sorted(data.pattern_weights) == [1, 3]
+    np.testing.assert_array_equal(data.unique_traits[:, data.pattern_inverse], traits.to_numpy())
+
+
+def test_phylo_data_exposes_traits_as_an_array():
+    traits = pd.DataFrame({"count": [10, 12]}, index=["A", "B"])
+    data = PhyloData(tree=None, traits=traits)
+
+    assert data.species_to_row == {"A": 0, "B": 1}
+    assert data.traits_values[data.species_to_row["B"], 0] == 12
+
+
+def test_phylo_data_round_trips_through_shared_memory():
+    traits = pd.DataFrame({"count": [10, 12]}, index=["A", "B"])
+    shared, shm = PhyloData(tree=None, traits=traits).to_shared()
+    try:
+        data, worker_shm = shared.attach()
+        pd.testing.assert_frame_equal(data.traits, traits)
+        assert np.shares_memory(data.traits_values, np.ndarray(shared.shape, shared.dtype, buffer=worker_shm.buf))
+        del data
+        worker_shm.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_phylo_data_indexes_the_tree_once():
+    data = load_phylo_data(
+        os.path.join(EXAMPLES_DIR, "simulated_tree.nwk"),
+        os.path.join(EXAMPLES_DIR, "simulated_counts.csv"),
+        tree_format=1,
+        counts_col="chromosome_number",
+        use_cache=False,
+    )
+    nodes = list(data.tree.traverse("postorder"))
+
+    assert list(data.leaf_names) == data.tree.get_leaf_names()
+    assert data.postorder_names == [node.name for node in nodes]
+    assert data.postorder_parent[-1] == -1
+    for i, node in enumerate(nodes):
+        kids = data.postorder_children[data.postorder_child_ptr[i]:data.postorder_child_ptr[i + 1]]
+        assert [nodes[k] for k in kids] == node.children
+
+
+def test_realize_tree_copies_deep_trees_with_typed_features():
+    tree = Tree()
+    node = tree
+    for i in range(3000):
+        node.add_child(name=f"t{i}")
+        node = node.add_child()
+    node.name = "last"
+    node.add_feature("species_id", 7)
+    result = AnalysisResult(annotated_tree=None, parameters={}, node_states=np.arange(6001))
+
+    annotated = result.realize_tree(tree)
+
+    assert annotated is not tree
+    assert annotated.get_leaf_names() == tree.get_leaf_names()
+    assert (annotated & "last").species_id == 7
+    assert [n.state for n in annotated.traverse("postorder")] == list(range(6001))
+    assert not hasattr(tree, "state")
+
+
+def test_tip_values_follow_the_tree_and_name_missing_tips():
+    tree = Tree("((A:1,B:1):1,C:2);")
+    data = PhyloData(tree=tree, traits=pd.DataFrame({"count": [3, 1, 2]}, index=["C", "A", "B"]))
+    assert list(data.tip_values()) == [1, 2, 3]
+
+    partial = PhyloData(tree=tree, traits=pd.DataFrame({"count": [1, 2]}, index=["A", "B"]))
+    with pytest.raises(ValueError, match="No traits for tips: \\['C'\\]"):
+        partial.tip_values()
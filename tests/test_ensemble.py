@@ -0,0 +1,208 @@
+import os
+
+import pandas as pd
+import pytest
+from ete3 import Tree
+
+from chr_re.core.data_loader import load_phylo_data
+from chr_re.core.models import PhyloData
+from chr_re.methods.ensemble import EnsembleMethod
+from chr_re.methods.maximum_likelihood import MaximumLikelihoodMethod
+from chr_re.methods.parsimony import ParsimonyMethod
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLES_DIR = os.path.join(BASE_DIR, "examples")
+
+
+class _TaggingMethod:
+    mutates_tree = True
+
+    def run(self, data, config=None):
+        data.tree.add_feature("tagged", True)
+        return ParsimonyMethod().run(data, {"algorithm": "Fitch"})
+
+
+class _SamplingMethod(_TaggingMethod):
+    nondeterministic = True
+
+
+class TestEnsembleMethod:
+    """
+    Tests for running several methods as one ensemble.
+    """
+    def setup_method(self, method):
+        self.data = load_phylo_data(
+            os.path.join(EXAMPLES_DIR, "simulated_tree.nwk"),
+            os.path.join(EXAMPLES_DIR, "simulated_counts.csv"),
+            tree_format=1,
+            counts_col="chromosome_number",
+        )
+
+    @pytest.mark.parametrize("parallel", [True, False])
+    def test_results_keep_method_order_and_failures(self, parallel):
+        ensemble = EnsembleMethod()
+        try:
+            result = ensemble.run(
+                self.data,
+                {
+                    "methods": [
+                        (MaximumLikelihoodMethod(), {"model": "OU"}),
+                        (ParsimonyMethod(), {"algorithm": "Fitch"}),
+                    ],
+                    "parallel": parallel,
+                },
+            )
+        finally:
+            ensemble.close()
+
+        failed, parsimony = result.raw_output
+        assert result.parameters["ensemble_size"] == 2
+        assert failed["method"] == "MaximumLikelihoodMethod"
+        assert "not implemented" in failed["error"]
+        assert parsimony.parameters["parsimony_score"] == 2
+        assert [leaf.state for leaf in parsimony.annotated_tree.iter_leaves()] == [10, 12, 14, 16]
+
+    def test_consensus_tree_carries_the_weighted_vote(self):
+        result = EnsembleMethod().run(
+            self.data,
+            {
+                "methods": [
+                    (ParsimonyMethod(), {"algorithm": "Fitch"}),
+                    (MaximumLikelihoodMethod(), {"model": "OU"}),
+                ],
+                "weights": [2.0, 1.0],
+            },
+        )
+
+        parsimony = result.raw_output[0].annotated_tree
+        for node, voted in zip(parsimony.traverse("preorder"), result.annotated_tree.traverse("preorder")):
+            assert voted.state == node.state
+            assert voted.state_support == 1.0
+        assert not hasattr(self.data.tree, "state")
+
+    def test_in_process_members_that_mutate_get_their_own_tree(self):
+        result = EnsembleMethod().run(
+            self.data, {"methods": [(_TaggingMethod(), {}), (ParsimonyMethod(), {"algorithm": "Fitch"})]}
+        )
+
+        assert result.raw_output[0].parameters["parsimony_score"] == 2
+        assert not hasattr(self.data.tree, "tagged")
+
+    def test_repeated_runs_reuse_member_results(self):
+        ensemble = EnsembleMethod()
+        config = {"methods": [(ParsimonyMethod(), {"algorithm": "Fitch"})]}
+
+        first = ensemble.run(self.data, config)
+        second = ensemble.run(self.data, config)
+        assert second.raw_output[0] is first.raw_output[0]
+
+        config = {"methods": [(_SamplingMethod(), {})]}
+        assert ensemble.run(self.data, config).raw_output[0] is not ensemble.run(self.data, config).raw_output[0]
+
+    def test_member_cache_fingerprints_once_and_keys_on_the_class(self, monkeypatch):
+        from chr_re.methods import ensemble as ensemble_module
+
+        fingerprints = []
+        real_fingerprint = ensemble_module._fingerprint
+        monkeypatch.setattr(
+            ensemble_module, "_fingerprint", lambda data: fingerprints.append(1) or real_fingerprint(data)
+        )
+        # Same class name as _TaggingMethod, different class
+        Shadow = type("_TaggingMethod", (), {"run": lambda self, data, config=None: "shadow"})
+        ensemble = EnsembleMethod()
+
+        ensemble.run(self.data, {"methods": [(ParsimonyMethod(), {"algorithm": "Fitch"}), (_TaggingMethod(), {})]})
+        assert len(fingerprints) == 1
+
+        result = ensemble.run(self.data, {"methods": [(Shadow(), {})]})
+        assert result.raw_output == ["shadow"]
+
+    @pytest.mark.parametrize("parallel", [True, False])
+    def test_confident_first_method_stops_the_ensemble(self, parallel):
+        uniform = PhyloData(
+            tree=Tree("((A:1,B:1):1,C:2);"), traits=pd.DataFrame({"count": [8, 8, 8]}, index=["A", "B", "C"])
+        )
+        config = {
+            "methods": [(ParsimonyMethod(), {"algorithm": "Fitch"}), (MaximumLikelihoodMethod(), {"model": "OU"})],
+            "early_stop_confidence": 0.99,
+            "parallel": parallel,
+        }
+
+        ensemble = EnsembleMethod()
+        try:
+            result = ensemble.run(uniform, config)
+            assert len(result.raw_output) == 1
+            assert result.parameters["stopped_early"]
+
+            result = ensemble.run(self.data, config)
+            assert len(result.raw_output) == 2
+            assert not result.parameters["stopped_early"]
+        finally:
+            ensemble.close()
+
+    def test_mismatched_weights_raise(self):
+        with pytest.raises(ValueError, match="weights"):
+            EnsembleMethod().run(
+                self.data, {"methods": [(ParsimonyMethod(), {"algorithm": "Fitch"})], "weights": [1, 2]}
+            )
+
+    def test_invalid_member_raises_before_running(self):
+        with pytest.raises(TypeError):
+            EnsembleMethod().run(self.data, {"methods": [(object(), {})]})
+
+    def test_empty_ensemble(self):
+        result = EnsembleMethod().run(self.data, {"methods": []})
+        assert result.raw_output == []
+        assert result.annotated_tree is None
+
+
+def test_worker_pool_is_kept_between_runs():
+    data = PhyloData(tree=Tree("((A:1,B:1):1,C:2);"), traits=pd.DataFrame({"count": [1, 2, 2]}, index=["A", "B", "C"]))
+    ensemble = EnsembleMethod()
+    try:
+        methods = [("parsimony", {"algorithm": "Fitch"}), ("ml", {"model": "BM"})]
+        ensemble.run(data, {"methods": methods, "parallel": True})
+        pool = ensemble._pool
+        methods = [("parsimony", {"algorithm": "Fitch"}), ("ml", {"model": "OU"})]
+        result = ensemble.run(data, {"methods": methods, "parallel": True})
+        assert ensemble._pool is pool
+        assert result.raw_output[0].parameters["parsimony_score"] == 1
+    finally:
+        ensemble.close()
+    assert ensemble._pool is None
+
+
+def test_deep_trees_fail_members_not_the_ensemble():
+    # A tree object pickles recursively; the workers get it as Newick, and a
+    # result that still cannot be pickled becomes that member's error entry
+    tree = Tree()
+    node, names = tree, []
+    for i in range(3000):
+        names.append(node.add_child(name=f"t{i}", dist=1.0).name)
+        node = node.add_child(name=f"n{i}", dist=1.0)
+    node.name = "last"
+    names.append(node.name)
+    data = PhyloData(tree=tree, traits=pd.DataFrame({"count": [10 + i % 2 for i in range(len(names))]}, index=names))
+    ensemble = EnsembleMethod()
+    try:
+        methods = [("parsimony", {"algorithm": "Fitch"}), ("ml", {"model": "OU"})]
+        result = ensemble.run(data, {"methods": methods, "parallel": True, "max_workers": 2})
+    finally:
+        ensemble.close()
+
+    parsimony, ml = result.raw_output
+    assert parsimony["method"] == "ParsimonyMethod"
+    assert "recursion" in parsimony["error"]
+    assert ml["method"] == "MaximumLikelihoodMethod"
+
+
+def test_ensembles_in_worker_processes_run_in_process(monkeypatch):
+    data = PhyloData(tree=Tree("((A:1,B:1):1,C:2);"), traits=pd.DataFrame({"count": [1, 2, 2]}, index=["A", "B", "C"]))
+    monkeypatch.setattr("multiprocessing.parent_process", lambda: object())
+    ensemble = EnsembleMethod()
+    methods = [("parsimony", {"algorithm": "Fitch"}), ("ml", {"model": "OU"})]
+
+    result = ensemble.run(data, {"methods": methods, "parallel": True})
+
+    assert ensemble._pool is None
+    assert result.raw_output[0].parameters["parsimony_score"] == 1
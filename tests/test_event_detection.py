@@ -0,0 +1,48 @@
+import pytest
+from ete3 import Tree
+
+from chr_re.analysis.event_detection import detect_significant_events
+from chr_re.core.models import AnalysisResult
+
+
+def _annotated_result(states):
+    tree = Tree("(A:0.1,B:0.2,(C:0.3,D:0.4)E:0.5)F;", format=1)
+    for node in tree.traverse():
+        node.add_feature("state", states[node.name])
+    return AnalysisResult(annotated_tree=tree, parameters={})
+
+
+class TestDetectSignificantEvents:
+    """
+    Tests for detecting large state changes between parent and child nodes.
+    """
+    def test_changes_at_or_above_threshold_are_events(self):
+        result = _annotated_result({"F": 10, "A": 10, "B": 12, "E": 15, "C": 15, "D": 20})
+
+        events = detect_significant_events(result, config={"change_threshold": 5})
+
+        assert [event["node"] for event in events] == ["E", "D"]
+        assert events[0] == {
+            "node": "E",
+            "branch_length": 0.5,
+            "parent_state": 10,
+            "child_state": 15,
+            "change": 5.0,
+        }
+
+    def test_root_is_never_an_event(self):
+        result = _annotated_result({name: 10 for name in "ABCDEF"})
+
+        events = detect_significant_events(result, config={"change_threshold": 0})
+
+        assert sorted(event["node"] for event in events) == ["A", "B", "C", "D", "E"]
+
+    def test_missing_annotated_tree_raises(self):
+        with pytest.raises(ValueError):
+            detect_significant_events(AnalysisResult(annotated_tree=None, parameters={}))
+
+    def test_unannotated_node_raises(self):
+        result = AnalysisResult(annotated_tree=Tree("(A:1,B:1);"), parameters={})
+        with pytest.raises(ValueError, match="state"):
+            detect_significant_events(result)
+
@@ -0,0 +1,112 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from chr_re.core.framework import ChromosomeReconstructionFramework
+from chr_re.core.models import MethodConfig
+from chr_re.methods.ensemble import EnsembleMethod
+from chr_re.methods.parsimony import ParsimonyMethod
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLES_DIR = os.path.join(BASE_DIR, "examples")
+
+
+class TestMethodRegistry:
+    """
+    Tests for looking up reconstruction methods by name.
+    """
+    def test_names_are_case_insensitive(self):
+        assert isinstance(ChromosomeReconstructionFramework._get_method_instance("Parsimony"), ParsimonyMethod)
+        assert isinstance(ChromosomeReconstructionFramework._get_method_instance("ENSEMBLE"), EnsembleMethod)
+
+    def test_each_call_returns_a_new_instance(self):
+        first = ChromosomeReconstructionFramework._get_method_instance("parsimony")
+        assert first is not ChromosomeReconstructionFramework._get_method_instance("parsimony")
+
+    def test_importing_the_framework_loads_no_method_backends(self):
+        code = (
+            "import sys, chr_re.core.framework; "
+            "print(sorted(m for m in ('chr_re.methods.bayesian', 'chr_re.methods.parsimony', 'skbio') "
+            "if m in sys.modules))"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=BASE_DIR, check=True)
+        assert out.stdout.strip() == "[]"
+
+    def test_unknown_method_raises(self):
+        with pytest.raises(ValueError, match="Unknown reconstruction method 'wagner'"):
+            ChromosomeReconstructionFramework._get_method_instance("wagner")
+
+
+class TestFramework:
+    """
+    Tests for running a reconstruction through the framework.
+    """
+    def setup_method(self, method):
+        self.framework = ChromosomeReconstructionFramework()
+
+    def teardown_method(self, method):
+        self.framework.close()
+
+    def _load(self):
+        self.framework.load_data(
+            os.path.join(EXAMPLES_DIR, "simulated_tree.nwk"),
+            os.path.join(EXAMPLES_DIR, "simulated_counts.csv"),
+            tree_format=1,
+            counts_col="chromosome_number",
+        )
+
+    def test_reconstruct_by_method_name(self):
+        self._load()
+        result = self.framework.reconstruct_ancestors(method="parsimony", algorithm="Fitch")
+        assert result.parameters["parsimony_score"] == 2
+        assert self.framework.reconstruction_results is result
+
+    def test_reconstruct_with_a_method_config(self):
+        self._load()
+        method_config = MethodConfig("parsimony", {"algorithm": "Fitch"})
+
+        first = self.framework.reconstruct_ancestors(method_config=method_config)
+        pipeline = self.framework.pipeline
+        second = self.framework.reconstruct_ancestors(method_config=method_config)
+
+        assert first.parameters["parsimony_score"] == 2
+        assert second is first
+        assert self.framework.pipeline is pipeline
+
+    def test_method_config_with_keywords_raises(self):
+        self._load()
+        method_config = MethodConfig("parsimony", {"algorithm": "Fitch"})
+        with pytest.raises(TypeError, match="not both"):
+            self.framework.reconstruct_ancestors(method_config=method_config, algorithm="Sankoff")
+
+    def test_ensemble_accepts_method_names(self):
+        self._load()
+        result = self.framework.reconstruct_ancestors(
+            method="ensemble", methods=[("parsimony", {"algorithm": "Fitch"})]
+        )
+        assert result.raw_output[0].parameters["parsimony_score"] == 2
+
+    def test_reconstruct_before_loading_raises(self):
+        with pytest.raises(ValueError, match="load_data"):
+            self.framework.reconstruct_ancestors(method="parsimony", algorithm="Fitch")
+
+    def test_context_manager_closes_method_pools(self):
+        with ChromosomeReconstructionFramework() as framework:
+            framework.load_data(
+                os.path.join(EXAMPLES_DIR, "simulated_tree.nwk"),
+                os.path.join(EXAMPLES_DIR, "simulated_counts.csv"),
+                tree_format=1,
+                counts_col="chromosome_number",
+            )
+            framework.reconstruct_ancestors(
+                method="ensemble",
+                methods=[("parsimony", {"algorithm": "Fitch"}), ("parsimony", {"algorithm": "Sankoff"})],
+                parallel=True,
+                max_workers=2,
+            )
+            ensemble = framework.pipeline.method
+            assert ensemble._pool is not None
+
+        assert ensemble._pool is None
@@ -0,0 +1,71 @@
+import math
+
+import pandas as pd
+import pytest
+from ete3 import Tree
+
+from chr_re.core.models import PhyloData
+from chr_re.methods.maximum_likelihood import MaximumLikelihoodMethod
+
+
+def test_bm_matches_the_closed_form_on_a_three_tip_tree():
+    tree = Tree("((A:1,B:1)AB:1,C:2)R;", format=1)
+    data = PhyloData(tree=tree, traits=pd.DataFrame({"count": [0.0, 2.0, 4.0]}, index=["A", "B", "C"]))
+
+    log_likelihood, sigma2, node_means = MaximumLikelihoodMethod()._calculate_bm(data)
+
+    # Contrasts: A-B (2, variance 2) and AB-C (3, variance 3.5)
+    assert sigma2 == pytest.approx((4 / 2 + (4 - 1) ** 2 / 3.5) / 2)
+    expected = -0.5 * (2 * math.log(2 * math.pi * sigma2) + math.log(2) + math.log(3.5) + 2)
+    assert log_likelihood == pytest.approx(expected)
+    # The joint ML ancestors minimize the squared changes weighted by branch length
+    means = dict(zip(data.postorder_names, node_means))
+    assert means["AB"] == pytest.approx(10 / 7)
+    assert means["R"] == pytest.approx(16 / 7)
+    assert means["A"] == 0.0
+
+
+def test_bm_handles_zero_length_branches():
+    tree = Tree("((A:0,B:0)AB:1,C:2)R;", format=1)
+    data = PhyloData(tree=tree, traits=pd.DataFrame({"count": [1.0, 1.0, 4.0]}, index=["A", "B", "C"]))
+
+    log_likelihood, sigma2, node_means = MaximumLikelihoodMethod()._calculate_bm(data)
+
+    assert math.isfinite(log_likelihood)
+    assert sigma2 == pytest.approx(9 / 3 / 2)
+    assert dict(zip(data.postorder_names, node_means))["AB"] == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize(
+    ("newick", "counts"), [("(A:1)R;", [3.0]), ("((A:1,B:1)AB:1,C:2)R;", [3.0, 3.0, 3.0])]
+)
+def test_bm_rejects_data_without_contrasts(newick, counts):
+    names = ["A", "B", "C"][: len(counts)]
+    data = PhyloData(tree=Tree(newick, format=1), traits=pd.DataFrame({"count": counts}, index=names))
+    with pytest.raises(ValueError):
+        MaximumLikelihoodMethod().run(data, {"model": "BM"})
+
+
+def test_run_bm_annotates_the_tree():
+    tree = Tree("((A:1,B:1)AB:1,C:2)R;", format=1)
+    data = PhyloData(tree=tree, traits=pd.DataFrame({"count": [0.0, 2.0, 4.0]}, index=["A", "B", "C"]))
+
+    result = MaximumLikelihoodMethod().run(data, {"model": "BM"})
+
+    assert result.parameters["model_name"] == "BM"
+    assert result.parameters["num_params"] == 1
+    assert math.isfinite(result.likelihood)
+    assert (result.annotated_tree & "AB").state == pytest.approx(10 / 7)
+    assert not hasattr(tree, "state")
+
+
+def test_bm_log_likelihood_stays_finite_on_large_trees():
+    tree = Tree()
+    tree.populate(2000, random_branches=True)
+    traits = pd.DataFrame({"count": pd.Series({leaf.name: float(i % 7) for i, leaf in enumerate(tree)})})
+
+    log_likelihood, sigma2, _ = MaximumLikelihoodMethod()._calculate_bm(PhyloData(tree=tree, traits=traits))
+
+    assert math.isfinite(log_likelihood)
+    assert sigma2 > 0
+
@@ -0,0 +1,115 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from chr_re.analysis.model_selection import calculate_aic, compare_models, fit_and_compare, to_json
+from chr_re.core.models import AnalysisResult
+
+
+def _result(model_name, log_likelihood, num_params):
+    return AnalysisResult(
+        annotated_tree=None,
+        parameters={"model_name": model_name, "num_params": num_params},
+        likelihood=log_likelihood,
+    )
+
+
+def _fit_bm(data):
+    return _result("BM", data["bm"], 1)
+
+
+def _fit_ou(data):
+    return _result("OU", data["ou"], 3)
+
+
+def _fit_reporting_start_method(data):
+    # A forked worker would inherit the parent's modules, event detection included
+    import sys
+
+    inherited = "chr_re.analysis.event_detection" in sys.modules
+    return _result("forked" if inherited else "spawned", data, 1)
+
+
+class TestCompareModels:
+    """
+    Tests for AIC-based model comparison.
+    """
+    def test_models_are_ranked_by_aic(self):
+        results = [
+            _result("BM", -55.4, 1),
+            _result("OU", -50.1, 3),
+            AnalysisResult(annotated_tree=None, parameters={"parsimony_score": 10}),
+        ]
+
+        table = compare_models(results)["comparison"]
+
+        assert [row["model_name"] for row in table] == ["OU", "BM"]
+        assert table[0]["aic"] == pytest.approx(calculate_aic(-50.1, 3))
+        assert table[1]["aic"] == pytest.approx(calculate_aic(-55.4, 1))
+
+    def test_delta_aic_and_weights(self):
+        table = compare_models([_result("BM", -55.4, 1), _result("OU", -50.1, 3)])["comparison"]
+
+        assert table[0]["delta_aic"] == 0.0
+        assert table[1]["delta_aic"] == pytest.approx(table[1]["aic"] - table[0]["aic"])
+        assert sum(row["aic_weight"] for row in table) == pytest.approx(1.0)
+        assert table[0]["aic_weight"] > table[1]["aic_weight"]
+
+    def test_ties_keep_input_order(self):
+        table = compare_models([_result("first", -10.0, 1), _result("second", -10.0, 1)])["comparison"]
+        assert [row["model_name"] for row in table] == ["first", "second"]
+
+    def test_repeated_comparisons_reuse_and_refresh_aic(self):
+        from chr_re.analysis import model_selection
+
+        result = _result("BM", -55.4, 1)
+        assert compare_models([result])["comparison"][0]["aic"] == pytest.approx(112.8)
+        assert id(result) in model_selection._AIC_CACHE
+
+        result.likelihood = -50.0
+        assert compare_models([result])["comparison"][0]["aic"] == pytest.approx(102.0)
+
+        key = id(result)
+        del result
+        assert key not in model_selection._AIC_CACHE
+
+    def test_to_json_round_trips(self):
+        import json
+
+        comparison = compare_models([_result("BM", -55.4, 1), _result("OU", -50.1, 3)])
+        assert json.loads(to_json(comparison)) == comparison
+
+    def test_no_valid_results_raises(self):
+        with pytest.raises(ValueError):
+            compare_models([AnalysisResult(annotated_tree=None, parameters={})])
+
+
+def test_fit_and_compare_runs_fits_in_workers():
+    comparison = fit_and_compare([_fit_bm, _fit_ou], {"bm": -55.4, "ou": -50.1}, max_workers=2)
+    assert [row["model_name"] for row in comparison["comparison"]] == ["OU", "BM"]
+
+
+def test_fit_and_compare_with_running_threads():
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pool.submit(release.wait, 30)
+        try:
+            comparison = fit_and_compare([_fit_bm, _fit_ou], {"bm": -55.4, "ou": -50.1}, max_workers=2)
+        finally:
+            release.set()
+    assert [row["model_name"] for row in comparison["comparison"]] == ["OU", "BM"]
+
+
+def test_fit_and_compare_spawns_workers_after_event_detection():
+    from ete3 import Tree
+
+    from chr_re.analysis.event_detection import detect_significant_events
+
+    tree = Tree("(A:0.1,B:0.2,(C:0.3,D:0.4)E:0.5)F;", format=1)
+    for node, state in zip(tree.traverse("preorder"), [10, 10, 12, 15, 15, 20]):
+        node.add_feature("state", state)
+    assert detect_significant_events(AnalysisResult(annotated_tree=tree, parameters={}))
+
+    comparison = fit_and_compare([_fit_reporting_start_method], -1.0, max_workers=1)
+    assert comparison["comparison"][0]["model_name"] == "spawned"
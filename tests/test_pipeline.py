@@ -0,0 +1,169 @@
+import os
+import random
+
+import pandas as pd
+import pytest
+from ete3 import Tree
+
+from chr_re.core.data_loader import load_phylo_data
+from chr_re.core.models import AnalysisResult, PhyloData
+from chr_re.core.pipeline import Pipeline
+from chr_re.methods.base import BaseMethod
+from chr_re.methods.parsimony import ParsimonyMethod
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLES_DIR = os.path.join(BASE_DIR, "examples")
+
+
+def _reference_fitch(tree, tip_states):
+    """Set-based Fitch pass used to check the bitset implementation."""
+    score = 0
+    states = {}
+    for node in tree.traverse("postorder"):
+        if node.is_leaf():
+            states[node] = {tip_states[node.name]}
+        elif len(node.children) == 1:
+            states[node] = states[node.children[0]]
+        else:
+            child_sets = [states[child] for child in node.children]
+            states[node] = set.intersection(*child_sets)
+            if not states[node]:
+                states[node] = set.union(*child_sets)
+                score += 1
+    return score, [states[node] for node in tree.traverse()]
+
+
+class _CountingMethod(BaseMethod):
+    def __init__(self):
+        self.calls = 0
+
+    def run(self, data, config=None):
+        self.calls += 1
+        return AnalysisResult(annotated_tree=None, parameters=dict(config or {}))
+
+
+class TestPipelineCache:
+    """
+    Tests for reusing results of repeated pipeline runs.
+    """
+    def setup_method(self, method):
+        self.method = _CountingMethod()
+        self.pipeline = Pipeline(method=self.method)
+        self.data = PhyloData(
+            tree=Tree("(A:1,B:2);"), traits=pd.DataFrame({"count": [1, 2]}, index=["A", "B"])
+        )
+
+    def test_identical_runs_are_cached(self):
+        first = self.pipeline.run(self.data, {"x": 1})
+        assert self.pipeline.run(self.data, {"x": 1}) is first
+        assert self.method.calls == 1
+
+    def test_nondeterministic_methods_are_not_cached(self):
+        self.method.nondeterministic = True
+        self.pipeline.run(self.data, {"x": 1})
+        self.pipeline.run(self.data, {"x": 1})
+        assert self.method.calls == 2
+
+    def test_changed_inputs_rerun(self):
+        self.pipeline.run(self.data, {"x": 1})
+        self.pipeline.run(self.data, {"x": 2})
+        changed = PhyloData(tree=self.data.tree, traits=pd.DataFrame({"count": [1, 3]}, index=["A", "B"]))
+        self.pipeline.run(changed, {"x": 1})
+        longer = PhyloData(tree=Tree("(A:1,B:5);"), traits=self.data.traits)
+        self.pipeline.run(longer, {"x": 1})
+        assert self.method.calls == 4
+
+    def test_duck_typed_methods_are_accepted(self):
+        class External:
+            def run(self, data, config=None):
+                return "ran"
+
+        assert Pipeline(method=External()).run(self.data) == "ran"
+        with pytest.raises(TypeError, match="run"):
+            Pipeline(method=object())
+
+    def test_unhashable_config_and_clear_cache(self, monkeypatch):
+        from chr_re.core import pipeline as pipeline_module
+
+        def _fail(data):
+            raise AssertionError("fingerprinted data for an uncacheable config")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(pipeline_module, "_fingerprint", _fail)
+            self.pipeline.run(self.data, {"methods": []})
+        self.pipeline.run(self.data, {"methods": []})
+        assert self.method.calls == 2
+
+        self.pipeline.run(self.data)
+        self.pipeline.clear_cache()
+        self.pipeline.run(self.data)
+        assert self.method.calls == 4
+
+
+class TestFitchParsimony:
+    """
+    Tests for Fitch parsimony run through the pipeline.
+    """
+    def _run(self, data):
+        return Pipeline(method=ParsimonyMethod()).run(data, config={"algorithm": "Fitch"})
+
+    def test_example_data(self):
+        data = load_phylo_data(
+            os.path.join(EXAMPLES_DIR, "simulated_tree.nwk"),
+            os.path.join(EXAMPLES_DIR, "simulated_counts.csv"),
+            tree_format=1,
+            counts_col="chromosome_number",
+        )
+        result = self._run(data)
+
+        assert result.parameters["parsimony_score"] == 2
+        tree = result.annotated_tree
+        assert [leaf.state for leaf in tree.iter_leaves()] == [10, 12, 14, 16]
+        assert (tree & "E").states == {14, 16}
+        assert tree.state in tree.states
+        assert not hasattr(data.tree, "state")
+        assert list(result.node_states) == [node.state for node in tree.traverse("postorder")]
+
+    @pytest.mark.parametrize("n_states", [2, 5, 20, 150])
+    def test_matches_set_based_fitch_with_many_states(self, n_states):
+        rng = random.Random(0)
+        tree = Tree()
+        tree.populate(300, random_branches=True)
+        tip_states = {leaf.name: rng.randrange(n_states) for leaf in tree.iter_leaves()}
+        traits = pd.DataFrame({"count": pd.Series(tip_states)})
+
+        result = self._run(PhyloData(tree=tree, traits=traits))
+
+        expected_score, expected_sets = _reference_fitch(tree, tip_states)
+        assert result.parameters["parsimony_score"] == expected_score
+        for node, expected in zip(result.annotated_tree.traverse(), expected_sets):
+            assert node.states == expected
+            assert node.state in node.states
+            if not node.is_root() and node.up.state in node.states:
+                assert node.state == node.up.state
+
+    def test_run_many_reuses_one_worker_pool(self):
+        pipeline = Pipeline(method=ParsimonyMethod())
+        tree = Tree("((A:1,B:1):1,C:2);")
+        datasets = [
+            PhyloData(tree=tree, traits=pd.DataFrame({"count": counts}, index=["A", "B", "C"]))
+            for counts in ([1, 1, 2], [1, 2, 2], [3, 3, 3])
+        ]
+        extra = PhyloData(tree=tree, traits=pd.DataFrame({"count": [1, 2, 3]}, index=["A", "B", "C"]))
+        try:
+            results = pipeline.run_many(datasets, {"algorithm": "Fitch"}, max_workers=2)
+            pool = pipeline._pool
+            more = pipeline.run_many([datasets[0], extra], {"algorithm": "Fitch"})
+            assert pipeline._pool is pool
+        finally:
+            pipeline.close()
+
+        assert [r.parameters["parsimony_score"] for r in results] == [1, 1, 0]
+        assert more[0] is results[0]
+        assert more[1].parameters["parsimony_score"] == 2
+        assert pipeline._pool is None
+
+    def test_unknown_algorithm_raises(self):
+        data = PhyloData(tree=Tree("(A,B);"), traits=pd.DataFrame({"count": [1, 2]}, index=["A", "B"]))
+        with pytest.raises(ValueError, match="Unsupported"):
+            Pipeline(method=ParsimonyMethod()).run(data, config={"algorithm": "Wagner"})
@@ -0,0 +1,25 @@
+import pytest
+
+from chr_re.analysis.rate_analysis import calculate_evolutionary_rates
+from chr_re.core.models import AnalysisResult
+
+
+class TestCalculateEvolutionaryRates:
+    """
+    Tests for dispatching rate calculations on AnalysisResult parameters.
+    """
+    def test_bm_result(self):
+        result = AnalysisResult(annotated_tree=None, parameters={"sigma_sq": 0.05}, likelihood=-51.15)
+        rates = calculate_evolutionary_rates(result)
+        assert rates == {"method": "Maximum Likelihood (BM)", "rate_sigma_sq": 0.05}
+
+    def test_bayesian_result(self):
+        summary = {"mean": 0.06, "hpd_95": [0.02, 0.10]}
+        result = AnalysisResult(annotated_tree=None, parameters={"rate_posterior": summary})
+        rates = calculate_evolutionary_rates(result)
+        assert rates == {"method": "Bayesian", "rate_summary": summary}
+
+    def test_unrecognized_parameters_raise(self):
+        result = AnalysisResult(annotated_tree=None, parameters={"parsimony_score": 15})
+        with pytest.raises(ValueError):
+            calculate_evolutionary_rates(result)